@@ -0,0 +1,262 @@
+"""
+    Benchmarks the public computation paths of FinancialMaths on seeded portfolios of 1, 10^3 and 10^6 contracts.
+    Reports throughput, latency percentiles and peak memory per path, and stores or compares JSON baselines.
+
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from FinancialMaths_murigibrian import (Annuity, AnnuityPortfolio, CashFlows, LoanSolver, Rate, RateBatch, RateType, ScenarioEngine,
+                                        VaryAnnuity, YieldCurve, YieldSolver)
+
+SEED = 1729
+SIZES = (1, 1000, 1000000)
+
+# Scalar paths price objects one at a time, so they are timed on a sample of at most this many contracts.
+SCALAR_SAMPLE = 2000
+
+# Whole-portfolio paths are repeated this many times (at least) and for at least this many seconds.
+BATCH_REPEATS = 5
+BATCH_SECONDS = 0.5
+
+# Relative slowdown of the median latency reported as a regression.
+REGRESSION_THRESHOLD = 0.10
+
+
+def make_contracts(size: int, seed: int= SEED):
+    """
+        Returns the columns of a seeded portfolio of annuity contracts.
+    """
+
+    generator = np.random.default_rng(seed)
+    contracts = {
+        "rate": generator.uniform(0.01, 0.15, size),
+        "payment_mode": generator.choice(["arrear", "advance", "continuous"], size),
+        "term": generator.integers(1, 41, size),
+        "amount": generator.uniform(100, 10000, size).round(2),
+        "norminal_period": generator.choice([1, 2, 4, 12], size),
+        "vary_amount": generator.uniform(0, 50, size).round(2),
+    }
+    return contracts
+
+
+def scalar_paths(contracts: dict):
+    """
+        Returns (name, function of a contract index) for the paths that price one object at a time.
+        Objects are built up front so each path times only its own call.
+    """
+
+    sample = min(len(contracts["rate"]), SCALAR_SAMPLE)
+    rates = [Rate(contracts["rate"][k]) for k in range(sample)]
+    annuities = [Annuity(rates[k], contracts["payment_mode"][k], int(contracts["term"][k]), contracts["amount"][k], contracts["norminal_period"][k]) for k in range(sample)]
+    vary_annuities = [VaryAnnuity(rates[k], 1, contracts["vary_amount"][k], payment_mode= contracts["payment_mode"][k], annuity_term= int(contracts["term"][k]), norminal_period= contracts["norminal_period"][k]) for k in range(sample)]
+
+    paths = [
+        ("Rate.__init__", lambda k: Rate(contracts["rate"][k], norminal_period= 4)),
+        ("Rate.convert_to", lambda k: rates[k].convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= 12)),
+        ("Annuity.__init__", lambda k: Annuity(rates[k], contracts["payment_mode"][k], int(contracts["term"][k]), contracts["amount"][k], contracts["norminal_period"][k])),
+        ("Annuity.time_value", lambda k: annuities[k].time_value(differ_period= 1)),
+        ("Annuity.loan_schedule", lambda k: annuities[k].loan_schedule(100000)),
+        ("Annuity.sensitivities", lambda k: annuities[k].sensitivities()),
+        ("VaryAnnuity.time_value", lambda k: vary_annuities[k].time_value(differ_period= 1)),
+    ]
+    return sample, paths
+
+
+def batch_paths(contracts: dict):
+    """
+        Returns (name, function) for the paths that price the whole portfolio at once.
+    """
+
+    size = len(contracts["rate"])
+    batch = RateBatch(contracts["rate"])
+    portfolio = AnnuityPortfolio(batch, contracts["payment_mode"], contracts["term"], contracts["amount"], contracts["norminal_period"])
+    prices = portfolio.time_value()
+    curve = YieldCurve([1, 2, 5, 10, 20, 30], [0.03, 0.032, 0.035, 0.038, 0.04, 0.041], interpolation= "monotone-cubic")
+    cash_flows = CashFlows(contracts["amount"], contracts["term"])
+    engine = ScenarioEngine(portfolio)
+
+    # up to 100 scenarios, keeping about 10^7 contract-scenario cells
+    shifts = np.linspace(-0.01, 0.01, min(100, max(1, 10000000 // size)))
+
+    paths = [
+        ("RateBatch.__init__", lambda: RateBatch(contracts["rate"])),
+        ("RateBatch.convert_to", lambda: batch.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= contracts["norminal_period"])),
+        ("AnnuityPortfolio.time_value", lambda: portfolio.time_value(differ_period= 1)),
+        ("AnnuityPortfolio.iter_loan_schedules", lambda: sum(1 for _ in portfolio.iter_loan_schedules(100000, chunk_size= 65536))),
+        ("AnnuityPortfolio.sensitivities", lambda: portfolio.sensitivities()),
+        ("LoanSolver.solve_installment", lambda: LoanSolver.solve_installment(batch, 100000, contracts["payment_mode"], contracts["term"], contracts["norminal_period"])),
+        ("YieldSolver.annuity_yields", lambda: YieldSolver.annuity_yields(prices, contracts["payment_mode"], contracts["term"], contracts["amount"], contracts["norminal_period"])),
+        ("YieldCurve.discount_factors", lambda: curve.discount_factors(contracts["term"])),
+        ("CashFlows.npv", lambda: cash_flows.npv(curve)),
+        ("ScenarioEngine.portfolio_values", lambda: engine.portfolio_values(shifts)),
+    ]
+    return paths
+
+
+def peak_memory(function):
+    """
+        Returns the peak memory (bytes) allocated while the function runs.
+    """
+
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(latencies: np.ndarray, contracts: int, memory: int, mode: str):
+    """
+        Returns the throughput, latency percentiles and peak memory of a path.
+    """
+
+    median = float(np.median(latencies))
+    result = {
+        "mode": mode,
+        "contracts": contracts,
+        "runs": len(latencies),
+        "throughput": contracts / median if(mode == "batch")else(1 / median),
+        "latency_p50": median,
+        "latency_p95": float(np.percentile(latencies, 95)),
+        "latency_p99": float(np.percentile(latencies, 99)),
+        "peak_memory": memory,
+    }
+    return result
+
+
+def run_scalar(name: str, function, sample: int):
+    """
+        Times each call of a scalar path once per sampled contract, after one warm-up pass.
+    """
+
+    for k in range(min(sample, 10)):
+        function(k)
+
+    latencies = np.empty(sample)
+    for k in range(sample):
+        start = time.perf_counter()
+        function(k)
+        latencies[k] = time.perf_counter() - start
+
+    # peak memory of one call, as for batch paths, taken as the largest over a few contracts.
+    memory = max(peak_memory(lambda: function(k)) for k in range(min(sample, 10)))
+    return summarize(latencies, sample, memory, "scalar")
+
+
+def run_batch(name: str, function, size: int):
+    """
+        Times repeated whole-portfolio calls of a batch path, after one warm-up call.
+    """
+
+    function()
+    latencies = []
+    began = time.perf_counter()
+    while len(latencies) < BATCH_REPEATS or time.perf_counter() - began < BATCH_SECONDS:
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+        if len(latencies) >= 1000:
+            break
+
+    return summarize(np.array(latencies), size, peak_memory(function), "batch")
+
+
+def run(sizes, paths: str= None):
+    """
+        Returns the results of every path and size, keyed by 'path[size]'.
+    """
+
+    results = {}
+    for size in sizes:
+        contracts = make_contracts(size)
+        sample, scalars = scalar_paths(contracts)
+        for name, function in scalars:
+            if paths is None or paths in name:
+                results[f"{name}[{size}]"] = run_scalar(name, function, sample)
+                print(format_result(f"{name}[{size}]", results[f"{name}[{size}]"]), flush= True)
+
+        for name, function in batch_paths(contracts):
+            if paths is None or paths in name:
+                results[f"{name}[{size}]"] = run_batch(name, function, size)
+                print(format_result(f"{name}[{size}]", results[f"{name}[{size}]"]), flush= True)
+
+    return results
+
+
+def format_result(key: str, result: dict):
+    """
+        Returns a line describing a result.
+    """
+
+    return (f"{key:<50} {result['throughput']:>14,.0f} /s   p50 {result['latency_p50'] * 1e6:>12,.1f}us   p95 {result['latency_p95'] * 1e6:>12,.1f}us"
+            f"   p99 {result['latency_p99'] * 1e6:>12,.1f}us   peak {result['peak_memory'] / 2 ** 10:>12,.1f}KiB")
+
+
+def environment():
+    """
+        Returns the versions and machine the results were measured on.
+    """
+
+    return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform(), "processor": platform.processor(), "seed": SEED}
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """
+        Prints the change in median latency of every path in the baseline and returns the regressed paths.
+    """
+
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline["results"]:
+            continue
+
+        change = result["latency_p50"] / baseline["results"][key]["latency_p50"] - 1
+        flag = "REGRESSION" if(change > threshold)else("")
+        print(f"{key:<50} {change:>+8.1%} {flag}")
+        if flag:
+            regressions.append(key)
+
+    return regressions
+
+
+def main(arguments= None):
+    parser = argparse.ArgumentParser(description= "Benchmarks the public computation paths of FinancialMaths.")
+    parser.add_argument("--sizes", type= int, nargs= "+", default= list(SIZES), help= "portfolio sizes (contracts)")
+    parser.add_argument("--paths", help= "only run paths whose name contains this text")
+    parser.add_argument("--save", help= "write the results to this JSON baseline")
+    parser.add_argument("--compare", help= "compare the results with this JSON baseline")
+    parser.add_argument("--threshold", type= float, default= REGRESSION_THRESHOLD, help= "relative slowdown reported as a regression")
+    arguments = parser.parse_args(arguments)
+
+    results = run(arguments.sizes, arguments.paths)
+
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent= 2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        print(f"\nCompared with {arguments.compare} ({baseline['environment']['platform']}, numpy {baseline['environment']['numpy']})")
+        if compare(results, baseline, arguments.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
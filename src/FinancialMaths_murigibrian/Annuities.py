@@ -1,4 +1,17 @@
+import numpy as np
+
+from .AnnuityDerivatives import AnnuityDerivativeMethods
+from .CashFlows import CashFlows
+from .Conventions import PaymentMode, RateType
 from .InterestRates import Rate
+from .YieldCurves import YieldCurve
+
+# Number of periods computed together when a loan schedule is streamed row by row.
+LOAN_SCHEDULE_CHUNK_SIZE = 4096
+
+# Continuous payments are integrated with this many Gauss-Legendre nodes per interval of at most this length.
+GAUSS_LEGENDRE_NODES = 8
+CONTINUOUS_GRID_STEP = 0.25
 
 class Annuity:
     """
@@ -9,9 +22,10 @@ class Annuity:
     is_arrear: bool  # Payments for each installment are paid at the end of each norminal period.
     is_advance: bool  # Payments for each installment are paid at the begining of each norminal period.
     is_continuous: bool  # Payments are made through out the norminal period.
+    payment_mode: PaymentMode
 
     # Annuity core properties
-    annuity_rate: Rate  # Rate obj that contains effective interest rate 
+    annuity_rate: Rate  # Rate obj that contains effective interest rate, or a YieldCurve 
     annuity_term: float  # States for how long the annuities are paid
     annuity_amount: float  # Amount paid in each installment 
     norminal_period: float  # Length of period until the next compounding
@@ -35,30 +49,17 @@ class Annuity:
     def __set_payment_mode(self, payment_mode: str):
         """
             Sets the mode of payment. 
-            Either arrear, continuous or advance.
-        """
-        payment_mode = payment_mode.lower().strip()
-        if "arrear" in payment_mode:
-            # set is_arrear flag to true
-            self.is_arrear = True
-            self.is_continuous = False
-            self.is_advance = False
-
-        elif "continuous" in payment_mode:
-            # set is_continuous flag to true
-            self.is_arrear = False
-            self.is_continuous = True 
-            self.is_advance = False
-
-        elif ("due" in payment_mode) or ("advance" in payment_mode):
-            # set is_advance flag to true
-            self.is_arrear = False
-            self.is_continuous = False
-            self.is_advance = True
-            
-        else:
+            Either arrear, continuous or advance, as a PaymentMode or a string naming one.
+        """
+        mode = PaymentMode.parse(payment_mode)
+        if mode is None:
             # Error otherwise
-            raise AssertionError(f"The payment mode {payment_mode} is invalid.\n\t\tThe valid payment modes are: 'arrear', 'continuous', 'advance'")
+            raise AssertionError(f"The payment mode {payment_mode.lower().strip()} is invalid.\n\t\tThe valid payment modes are: 'arrear', 'continuous', 'advance'")
+
+        self.payment_mode = mode
+        self.is_arrear = mode is PaymentMode.ARREAR
+        self.is_continuous = mode is PaymentMode.CONTINUOUS
+        self.is_advance = mode is PaymentMode.ADVANCE
 
 
     def __validate_entries(self):
@@ -74,10 +75,37 @@ class Annuity:
             The value is set at the core arrear present value(arrea_pv).
         """
 
-        arrear_pv = (1 - self.annuity_rate.time_value_factor(self.annuity_term, discount= True)) / self.annuity_rate.convert_to("compound interest", norminal_period= self.norminal_period)
+        if isinstance(self.annuity_rate, YieldCurve):
+            # sum of the discounted installments on the curve
+            times = np.arange(1, round(self.annuity_term * self.norminal_period) + 1) / self.norminal_period
+            return float(np.sum(self.annuity_rate.discount_factors(times)) / self.norminal_period)
+
+        arrear_pv = (1 - self.annuity_rate.time_value_factor(self.annuity_term, discount= True)) / self.annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period)
         return arrear_pv
 
 
+    def payment_grid(self, breakpoints= (), is_continuous: bool= None):
+        """
+            Returns the payment times of the annuity and the weight of a unit installment at each time.
+            Continuous payments are integrated with Gauss-Legendre nodes; 'breakpoints' (e.g. curve tenors) bound the integration intervals.
+            'is_continuous' overrides the payment mode of the annuity.
+        """
+
+        term = self.annuity_term
+        is_continuous = self.is_continuous if(is_continuous is None)else(is_continuous)
+        if is_continuous:
+            breakpoints = np.asarray(breakpoints, dtype= float)
+            bounds = np.union1d(np.r_[np.arange(0, term, CONTINUOUS_GRID_STEP), term], breakpoints[(breakpoints > 0) & (breakpoints < term)])
+            widths = np.diff(bounds)[:, None]
+            nodes, weights = np.polynomial.legendre.leggauss(GAUSS_LEGENDRE_NODES)
+            return (bounds[:-1, None] + widths * (nodes + 1) / 2).ravel(), (widths * weights / 2).ravel()
+
+        # one installment of 1 / norminal_period per norminal period
+        count = round(term * self.norminal_period)
+        times = np.arange(1, count + 1) if(self.is_arrear)else(np.arange(count))
+        return times / self.norminal_period, np.full(count, 1 / self.norminal_period)
+
+
     def __get_pv_factor(self):
         """
             Returns the present value factor of an annuity.
@@ -91,11 +119,11 @@ class Annuity:
 
         elif self.is_continuous:
             # interest / foi
-            factor = self.annuity_rate.convert_to("compound interest", norminal_period= self.norminal_period) / self.annuity_rate.foi
+            factor = self.annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period) / self.annuity_rate.foi
         
         elif self.is_advance:
             # interest / discount
-            factor = self.annuity_rate.convert_to("compound interest", norminal_period= self.norminal_period) / self.annuity_rate.convert_to("compound discount", norminal_period= self.norminal_period)
+            factor = self.annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period) / self.annuity_rate.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= self.norminal_period)
 
         return factor
    
@@ -105,6 +133,9 @@ class Annuity:
             Returns the time value based on the period and type of annuity
         """
 
+        if isinstance(self.annuity_rate, YieldCurve):
+            return self.__curve_time_value(differ_rate, differ_period, is_fv)
+
         # find present value factors
         annuity_pv = self.arrear_pv * self.__get_pv_factor()
 
@@ -114,9 +145,9 @@ class Annuity:
             differ_rate = self.annuity_rate
  
 
-        elif not isinstance(differ_rate, Rate):
+        elif not isinstance(differ_rate, (Rate, YieldCurve)):
             # using assinged differ rate
-            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' not {type(differ_rate)}.")
+            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' or 'YieldCurve' not {type(differ_rate)}.")
 
         annuity_pv *= differ_rate.time_value_factor(differ_period, discount= True)
 
@@ -130,6 +161,58 @@ class Annuity:
         return annuity_pv
         
 
+    def __curve_time_value(self, differ_rate, differ_period: float, is_fv: bool):
+        """
+            Returns the time value of an annuity priced against a yield curve by discounting each payment on the curve.
+        """
+
+        curve = self.annuity_rate
+        if differ_rate == None:
+            # payments are discounted on the curve from their deferred times.
+            times, weights = self.payment_grid(curve.tenors - differ_period)
+            annuity_pv = np.sum(weights * curve.discount_factors(times + differ_period))
+
+        elif isinstance(differ_rate, (Rate, YieldCurve)):
+            times, weights = self.payment_grid(curve.tenors)
+            annuity_pv = np.sum(weights * curve.discount_factors(times)) * differ_rate.time_value_factor(differ_period, discount= True)
+
+        else:
+            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' or 'YieldCurve' not {type(differ_rate)}.")
+
+        if is_fv:
+            # get future value of the pv amount.
+            annuity_pv *= curve.time_value_factor(self.annuity_term + differ_period)
+
+        # Present value of the annuity
+        return float(annuity_pv * self.annuity_amount)
+
+
+    def sensitivities(self, differ_period: float= 0, is_fv: bool= False):
+        """
+            Returns the time value with its analytic derivatives in the force of interest and the interest rate, duration, convexity and DV01, in one pass.
+            Deferral is at the annuity rate, as in time_value. Only compound rates are supported.
+        """
+
+        rate = self.annuity_rate
+        if not isinstance(rate, Rate):
+            raise TypeError(f"The annuity rate is invalid. Sensitivities need a 'Rate' not {type(rate)}.")
+        if rate.is_simple_rate:
+            raise ValueError("The annuity rate is invalid. Sensitivities are only available for compound rates.")
+
+        pv = AnnuityDerivativeMethods.annuity_pv(rate.foi, self.is_arrear, self.is_advance, self.annuity_term, self.annuity_amount, self.norminal_period, differ_period, is_fv)
+        return {name: float(value) for name, value in AnnuityDerivativeMethods.sensitivities(pv, rate.interest_rate).items()}
+
+
+    def to_cash_flows(self, differ_period: float= 0):
+        """
+            Returns the installments of the annuity as CashFlows, deferred by the differ period.
+            Continuous payments are split over the Gauss-Legendre nodes of payment_grid.
+        """
+
+        times, weights = self.payment_grid()
+        return CashFlows(weights * self.annuity_amount, times + differ_period)
+
+
     def loan_schedule(self, loan_amount: float= 1):
         """
             Generates a loan shedule from the annuity
@@ -155,18 +238,60 @@ class Annuity:
  
 
         return  temp
-        
-    
 
 
+    def __loan_schedule_block(self, periods, installment: float, loan_amount: float, balance: float):
+        """
+            Returns the loan shedule rows of the given periods as NumPy columns.
+            The balance is the outstanding amount before the first of the periods.
+        """
 
+        rate = self.annuity_rate
 
+        # accumulation factors of all periods as one array, from the rate's factor table when built.
+        principal = (installment - loan_amount * rate.interest_rate) * rate.time_value_factors(periods)
+        block = {
+            "period": periods + 1 if(self.is_arrear)else(periods),
+            "installment": np.full(len(periods), installment),
+            "principal": principal,
+            "interest": installment - principal,
+            "balance": balance - np.cumsum(principal),
+        }
 
+        return block
 
 
+    def loan_schedule_arrays(self, loan_amount: float= 1):
+        """
+            Generates a loan shedule from the annuity with every period computed at once.
+            Returns a columnar dict of NumPy arrays with the same keys as loan_schedule.
+        """
 
+        installment = loan_amount / self.time_value()
+        return self.__loan_schedule_block(np.arange(self.annuity_term), installment, loan_amount, loan_amount)
 
 
+    def iter_loan_schedule(self, loan_amount: float= 1, chunk_size: int= None):
+        """
+            Lazily generates a loan shedule from the annuity.
+            Yields one dict per period, or columnar dicts of at most 'chunk_size' periods when a chunk size is given.
+            Only one chunk is held in memory at a time.
+        """
 
+        if chunk_size is None:
+            # rows are unpacked from internally sized chunks.
+            for chunk in self.iter_loan_schedule(loan_amount, chunk_size= LOAN_SCHEDULE_CHUNK_SIZE):
+                for row in zip(*(column.tolist() for column in chunk.values())):
+                    yield dict(zip(chunk, row))
+            return
 
+        if chunk_size < 1:
+            raise ValueError("The chunk size is invalid. It should be a positive integer.")
 
+        installment = loan_amount / self.time_value()
+        balance = loan_amount
+        for start in range(0, int(self.annuity_term), chunk_size):
+            chunk = self.__loan_schedule_block(np.arange(start, min(start + chunk_size, self.annuity_term)), installment, loan_amount, balance)
+            balance = chunk["balance"][-1]
+            yield chunk
+        
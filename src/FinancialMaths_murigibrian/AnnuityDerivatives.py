@@ -0,0 +1,178 @@
+import numpy as np
+
+
+# Forces of interest closer to zero than this are evaluated at this value, where the annuity formulas are 0 / 0.
+# The closed forms cancel as the force of interest approaches zero, so derivatives lose precision for rates below ~0.1%.
+FOI_FLOOR = 1e-9
+
+
+class AnnuityDerivativeMethods:
+    """
+        Contains closed-form annuity present values and their first and second derivatives with respect to the force of interest (foi).
+        Every method returns a (value, first derivative, second derivative) triple and accepts floats or NumPy arrays.
+    """
+
+    def jet_product(left: tuple, right: tuple):
+        """
+            Returns the (value, first, second derivative) triple of the product of two triples.
+        """
+
+        product = (left[0] * right[0],
+                   left[1] * right[0] + left[0] * right[1],
+                   left[2] * right[0] + 2 * left[1] * right[1] + left[0] * right[2])
+        return product
+
+
+    def jet_quotient(numerator: tuple, denominator: tuple):
+        """
+            Returns the (value, first, second derivative) triple of the quotient of two triples.
+        """
+
+        value = numerator[0] / denominator[0]
+        first = (numerator[1] - value * denominator[1]) / denominator[0]
+        second = (numerator[2] - 2 * first * denominator[1] - value * denominator[2]) / denominator[0]
+        return (value, first, second)
+
+
+    def jet_exp(foi, time):
+        """
+            Returns the triple of the factor exp(foi * time), e.g. an accumulation factor (or a discount factor for negative time).
+        """
+
+        factor = np.exp(foi * time)
+        return (factor, time * factor, time * time * factor)
+
+
+    def level_pv(foi, is_arrear, is_advance, annuity_term, norminal_period):
+        """
+            Returns the triple of the present value of a unit annuity, paid in arrear, in advance or otherwise continuously.
+            Matches Annuity.time_value for compound rates.
+        """
+
+        foi = np.where(np.abs(foi) < FOI_FLOOR, FOI_FLOOR, foi)
+        discount = np.exp(-foi * annuity_term)
+        numerator = (-np.expm1(-foi * annuity_term), annuity_term * discount, -annuity_term * annuity_term * discount)
+
+        # norminal interest (arrear), norminal discount (advance) or force of interest (continuous) denominators
+        growth = np.exp(foi / norminal_period)
+        shrink = 1 / growth
+        denominator = (np.where(is_arrear, norminal_period * np.expm1(foi / norminal_period), np.where(is_advance, -norminal_period * np.expm1(-foi / norminal_period), foi)),
+                       np.where(is_arrear, growth, np.where(is_advance, shrink, 1.0)),
+                       np.where(is_arrear, growth / norminal_period, np.where(is_advance, -shrink / norminal_period, 0.0)))
+
+        return AnnuityDerivativeMethods.jet_quotient(numerator, denominator)
+
+
+    def increasing_pv(foi, is_arrear, is_advance, annuity_term, norminal_period):
+        """
+            Returns the triple of the present value of a unit increasing annuity.
+            Matches VaryAnnuityMethods.increasing_arrear_pv, increasing_advance_pv and increasing_continuous_pv.
+        """
+
+        foi = np.where(np.abs(foi) < FOI_FLOOR, FOI_FLOOR, foi)
+        advance = AnnuityDerivativeMethods.level_pv(foi, False, True, annuity_term, 1)
+
+        # (yearly advance pv - term * discount factor) / norminal interest rate
+        discount = AnnuityDerivativeMethods.jet_exp(foi, -annuity_term)
+        numerator = tuple(advance[order] - annuity_term * discount[order] for order in range(3))
+        growth = np.exp(foi / norminal_period)
+        inc_arrear = AnnuityDerivativeMethods.jet_quotient(numerator, (norminal_period * np.expm1(foi / norminal_period), growth, growth / norminal_period))
+
+        # advance: times the norminal interest / norminal discount ratio, exp(foi / norminal period)
+        to_advance = AnnuityDerivativeMethods.jet_exp(foi, 1 / norminal_period)
+
+        # continuous: times the norminal interest / foi ratio
+        to_continuous = AnnuityDerivativeMethods.jet_quotient(
+            (norminal_period * np.expm1(foi / norminal_period), to_advance[0], to_advance[0] / norminal_period),
+            (foi, 1.0, 0.0))
+
+        factor = tuple(np.where(is_arrear, 1.0 if(order == 0)else(0.0), np.where(is_advance, to_advance[order], to_continuous[order])) for order in range(3))
+        return AnnuityDerivativeMethods.jet_product(inc_arrear, factor)
+
+
+    def increasing_time_continuous_pv(foi, annuity_term):
+        """
+            Returns the triple of the present value of a continuous annuity paid at rate t at time t.
+            Matches VaryAnnuityMethods.increasing_time_continuous_pv.
+        """
+
+        foi = np.where(np.abs(foi) < FOI_FLOOR, FOI_FLOOR, foi)
+        continuous = AnnuityDerivativeMethods.level_pv(foi, False, False, annuity_term, 1)
+        discount = AnnuityDerivativeMethods.jet_exp(foi, -annuity_term)
+        numerator = tuple(continuous[order] - annuity_term * discount[order] for order in range(3))
+
+        return AnnuityDerivativeMethods.jet_quotient(numerator, (foi, 1.0, 0.0))
+
+
+    def annuity_pv(foi, is_arrear, is_advance, annuity_term, annuity_amount= 1, norminal_period= 1, differ_period= 0, is_fv: bool= False):
+        """
+            Returns the triple of Annuity.time_value, deferred at the annuity's own rate.
+        """
+
+        pv = AnnuityDerivativeMethods.level_pv(foi, is_arrear, is_advance, annuity_term, norminal_period)
+        pv = AnnuityDerivativeMethods.jet_product(pv, AnnuityDerivativeMethods.jet_exp(foi, -differ_period if(not is_fv)else(annuity_term)))
+
+        return tuple(order * annuity_amount for order in pv)
+
+
+    def vary_annuity_pv(foi, base_amount, vary_amount, is_time_continuous, is_arrear, is_advance, annuity_term, annuity_amount= 1, norminal_period= 1, differ_period= 0, is_fv: bool= False):
+        """
+            Returns the triple of VaryAnnuity.time_value, deferred at the annuity's own rate.
+        """
+
+        level = AnnuityDerivativeMethods.level_pv(foi, is_arrear, is_advance, annuity_term, norminal_period)
+        increasing = AnnuityDerivativeMethods.increasing_pv(foi, is_arrear, is_advance, annuity_term, norminal_period)
+        time_continuous = AnnuityDerivativeMethods.increasing_time_continuous_pv(foi, annuity_term)
+
+        # time continuous increases apply to every mode but arrear
+        is_time_continuous = np.logical_and(is_time_continuous, np.logical_not(is_arrear))
+        pv = tuple(np.where(is_time_continuous, base_amount * time_continuous[order], (base_amount - vary_amount) * annuity_amount * level[order] + vary_amount * increasing[order]) for order in range(3))
+
+        return AnnuityDerivativeMethods.jet_product(pv, AnnuityDerivativeMethods.jet_exp(foi, -differ_period if(not is_fv)else(annuity_term)))
+
+
+    def geometric_pv(foi, growth_rate, is_time_continuous, is_arrear, is_advance, annuity_term, norminal_period= 1):
+        """
+            Returns the triple of VaryAnnuityMethods.geometric_pv, for installments growing by the growth rate once a year (or continuously).
+        """
+
+        adjusted_foi = foi - np.log1p(growth_rate)
+        adjusted_foi = np.where(np.abs(adjusted_foi) < FOI_FLOOR, FOI_FLOOR, adjusted_foi)
+
+        # first year's installments times a yearly annuity due at the adjusted rate
+        first_year = AnnuityDerivativeMethods.level_pv(foi, is_arrear, is_advance, 1, norminal_period)
+        term_discount = np.exp(-adjusted_foi * annuity_term)
+        discount = np.exp(-adjusted_foi)
+        due = AnnuityDerivativeMethods.jet_quotient(
+            (-np.expm1(-adjusted_foi * annuity_term), annuity_term * term_discount, -annuity_term * annuity_term * term_discount),
+            (-np.expm1(-adjusted_foi), discount, -discount))
+        geometric = AnnuityDerivativeMethods.jet_product(first_year, due)
+
+        time_continuous = AnnuityDerivativeMethods.level_pv(adjusted_foi, False, False, annuity_term, 1)
+        is_time_continuous = np.logical_and(is_time_continuous, np.logical_not(is_arrear))
+        return tuple(np.where(is_time_continuous, time_continuous[order], geometric[order]) for order in range(3))
+
+
+    def sensitivities(pv: tuple, interest_rate):
+        """
+            Returns the value of a (value, first derivative, second derivative) triple in the force of interest with its risk measures.
+            Derivatives in the effective interest rate follow from d(foi) / di = 1 / (1 + i).
+        """
+
+        value, d_foi, d2_foi = pv
+        d_interest = d_foi / (1 + interest_rate)
+        d2_interest = (d2_foi - d_foi) / (1 + interest_rate) ** 2
+
+        measures = {
+            "time_value": value,
+            "d_foi": d_foi,
+            "d2_foi": d2_foi,
+            "d_interest": d_interest,
+            "d2_interest": d2_interest,
+            "macaulay_duration": -d_foi / value,
+            "modified_duration": -d_interest / value,
+            "convexity": d2_interest / value,
+            "dv01": -d_interest * 1e-4,
+        }
+
+        return measures
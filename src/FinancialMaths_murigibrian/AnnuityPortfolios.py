@@ -0,0 +1,250 @@
+import numpy as np
+
+from .AnnuityDerivatives import AnnuityDerivativeMethods
+from .Annuities import LOAN_SCHEDULE_CHUNK_SIZE
+from .Conventions import PaymentMode, RateType
+from .RateBatches import RateBatch
+from .VaryAnnuities import VaryAnnuityMethods
+
+
+class AnnuityPortfolio:
+    """
+        Handles non-varying annuity calculations for many contracts at once.
+        Every contract property is a column; scalars are shared by all contracts.
+    """
+
+    # Annuity type of each contract
+    is_arrear: np.ndarray
+    is_advance: np.ndarray
+    is_continuous: np.ndarray
+
+    # Annuity core properties of each contract
+    annuity_rate: RateBatch
+    annuity_term: np.ndarray
+    annuity_amount: np.ndarray
+    norminal_period: np.ndarray
+
+    arrear_pv: np.ndarray
+
+    def __init__(self, annuity_rate: RateBatch, payment_mode= "arrear", annuity_term= 1, annuity_amount= 1, norminal_period= 1):
+        if not isinstance(annuity_rate, RateBatch):
+            raise TypeError(f"The annuity rate is invalid. It should be of type 'RateBatch' not {type(annuity_rate)}.")
+
+        self.annuity_rate = annuity_rate
+
+        # every column is broadcast to one value per contract.
+        size = len(annuity_rate)
+        self.annuity_term = np.broadcast_to(np.asarray(annuity_term, dtype= float), size)
+        self.annuity_amount = np.broadcast_to(np.asarray(annuity_amount, dtype= float), size)
+        self.norminal_period = np.broadcast_to(np.asarray(norminal_period, dtype= float), size)
+        self.__set_payment_mode(payment_mode, size)
+
+        self.arrear_pv = self.__to_arrear()
+
+
+    def __len__(self):
+        return len(self.annuity_rate)
+
+
+    def __set_payment_mode(self, payment_mode, size: int):
+        """
+            Sets the mode of payment of every contract.
+            Either arrear, continuous or advance, as PaymentModes or strings naming them.
+        """
+
+        flags = PaymentMode.parse_flags(payment_mode)
+        self.is_arrear, self.is_continuous, self.is_advance = (np.broadcast_to(flag, size) for flag in flags)
+
+
+    def __to_arrear(self):
+        """
+            Returns the present values of annuity arrears based on the provided properties.
+        """
+
+        arrear_pv = (1 - self.annuity_rate.time_value_factor(self.annuity_term, discount= True)) / self.annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period)
+        return arrear_pv
+
+
+    def __get_pv_factor(self):
+        """
+            Returns the present value factors of the annuities.
+            Each factor will be multiplied by the present value (PV) of an arrear annuity to find the annuity's PV
+        """
+
+        # no factor is required for annuities arrear.
+        factor = np.ones(len(self))
+
+        # interest / foi
+        rows = self.is_continuous
+        if rows.any():
+            rate = self.annuity_rate[rows]
+            factor[rows] = rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period[rows]) / rate.foi
+
+        # interest / discount
+        rows = self.is_advance
+        if rows.any():
+            rate = self.annuity_rate[rows]
+            factor[rows] = rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period[rows]) / rate.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= self.norminal_period[rows])
+
+        return factor
+
+
+    def time_value(self, differ_rate: RateBatch= None, differ_period= 0, is_fv: bool= False):
+        """
+            Returns the time values of every contract. Matches Annuity.time_value contract by contract.
+            A single-row differ rate is shared by all contracts.
+        """
+
+        # find present value factors
+        annuity_pv = self.arrear_pv * self.__get_pv_factor()
+
+        return self.__differ(annuity_pv, differ_rate, differ_period, is_fv)
+
+
+    def geometric_time_value(self, growth_rate, is_time_continuous= False, differ_rate: RateBatch= None, differ_period= 0, is_fv: bool= False):
+        """
+            Returns the time values of every contract with installments growing by the growth rates once a year. Matches VaryAnnuity(growth_rate= ...).time_value contract by contract.
+            The annuity amounts are the first year's installments. Only compound rates are supported. Time continuous rows (not in arrear) grow continuously.
+            Each contract is priced in closed form at its growth adjusted rate, whatever its term.
+        """
+
+        if self.annuity_rate.is_simple_rate.any():
+            raise ValueError("The annuity rates are invalid. Geometric annuities are only available for compound rates.")
+
+        growth_rate = np.broadcast_to(np.asarray(growth_rate, dtype= float), len(self))
+        is_time_continuous = np.broadcast_to(np.asarray(is_time_continuous, dtype= bool), len(self)) & ~self.is_arrear
+        adjusted_foi = self.annuity_rate.foi - np.log1p(growth_rate)
+
+        # the first year's installments, repeated each year at the adjusted rate
+        first_year = (1 - self.annuity_rate.time_value_factor(1, discount= True)) / self.annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= self.norminal_period) * self.__get_pv_factor()
+        annuity_pv = first_year * VaryAnnuityMethods.geometric_growth_factor(adjusted_foi, self.annuity_term)
+
+        rows = is_time_continuous
+        if rows.any():
+            annuity_pv[rows] = VaryAnnuityMethods.geometric_growth_factor(adjusted_foi[rows], self.annuity_term[rows], is_time_continuous= True)
+
+        return self.__differ(annuity_pv, differ_rate, differ_period, is_fv)
+
+
+    def sensitivities(self, differ_period= 0, is_fv: bool= False):
+        """
+            Returns columns of time values with their analytic derivatives in the force of interest and the interest rate, durations, convexities and DV01s.
+            Matches Annuity.sensitivities contract by contract. Only compound rates are supported.
+        """
+
+        rate = self.annuity_rate
+        if rate.is_simple_rate.any():
+            raise ValueError("The annuity rates are invalid. Sensitivities are only available for compound rates.")
+
+        pv = AnnuityDerivativeMethods.annuity_pv(rate.foi, self.is_arrear, self.is_advance, self.annuity_term, self.annuity_amount, self.norminal_period, differ_period, is_fv)
+        return AnnuityDerivativeMethods.sensitivities(pv, rate.interest_rate)
+
+
+    def __differ(self, annuity_pv: np.ndarray, differ_rate: RateBatch, differ_period, is_fv: bool):
+        """
+            Returns the unit present values differed, accumulated when future values are required, and scaled by the annuity amounts.
+        """
+
+        # Differ the annuities.
+        if differ_rate is None:
+            # initializing the defualt differ rates
+            differ_rate = self.annuity_rate
+
+        elif not isinstance(differ_rate, RateBatch):
+            raise TypeError(f"The differ rate is invalid. It should be of type 'RateBatch' not {type(differ_rate)}.")
+
+        annuity_pv *= differ_rate.time_value_factor(differ_period, discount= True)
+
+        if is_fv:
+            # get future values of the pv amounts.
+            annuity_pv *= self.annuity_rate.time_value_factor(self.annuity_term + differ_period)
+
+        # Present values of the annuities
+        annuity_pv *= self.annuity_amount
+
+        return annuity_pv
+
+
+    def loan_schedules(self, loan_amount= 1):
+        """
+            Generates the loan shedules of every contract at once.
+            Returns a columnar dict of 2-D arrays with contracts as rows and periods as columns.
+            Periods after a contract's term are NaN.
+        """
+
+        loan_amount = np.broadcast_to(np.asarray(loan_amount, dtype= float), len(self))[:, None]
+        term = self.annuity_term.astype(int)
+        periods = np.arange(term.max(initial= 0))
+        is_active = periods < term[:, None]
+
+        rate = self.annuity_rate[:, None]
+        installment = loan_amount / self.time_value()[:, None]
+
+        # accumulation factors of all contracts and periods as one block.
+        principal = (installment - loan_amount * rate.interest_rate) * rate.time_value_factor(periods)
+        principal = np.where(is_active, principal, np.nan)
+
+        schedules = {
+            "period": np.where(is_active, periods + self.is_arrear[:, None], np.nan),
+            "installment": np.where(is_active, installment, np.nan),
+            "principal": principal,
+            "interest": installment - principal,
+            "balance": loan_amount - np.cumsum(principal, axis= 1),
+        }
+
+        return schedules
+
+
+    def iter_loan_schedules(self, loan_amount= 1, chunk_size: int= None):
+        """
+            Lazily generates the loan shedules of every contract one after another.
+            Yields one dict per period, or columnar dicts of at most 'chunk_size' rows when a chunk size is given.
+            Each row holds the index of its contract under 'loan'. Only one chunk is held in memory at a time.
+        """
+
+        if chunk_size is None:
+            # rows are unpacked from internally sized chunks.
+            for chunk in self.iter_loan_schedules(loan_amount, chunk_size= LOAN_SCHEDULE_CHUNK_SIZE):
+                for row in zip(*(column.tolist() for column in chunk.values())):
+                    yield dict(zip(chunk, row))
+            return
+
+        if chunk_size < 1:
+            raise ValueError("The chunk size is invalid. It should be a positive integer.")
+
+        loan_amount = np.broadcast_to(np.asarray(loan_amount, dtype= float), len(self))
+        installment = loan_amount / self.time_value()
+
+        # rows of all schedules are numbered one after another.
+        term = self.annuity_term.astype(int)
+        ends = np.cumsum(term)
+        starts = ends - term
+        total = int(ends[-1]) if len(ends) else 0
+
+        balance = np.nan
+        for start in range(0, total, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, total))
+            loan = np.searchsorted(ends, rows, side= "right")
+            periods = rows - starts[loan]
+
+            rate = self.annuity_rate[loan]
+            principal = (installment[loan] - loan_amount[loan] * rate.interest_rate) * rate.time_value_factor(periods)
+
+            # balances start from the loan amount, or from the previous chunk when a schedule is split.
+            is_first = np.r_[True, loan[1:] != loan[:-1]]
+            first = np.flatnonzero(is_first)
+            segment = np.cumsum(is_first) - 1
+            opening = np.where(periods[first] == 0, loan_amount[loan[first]], balance)
+            paid = np.cumsum(principal)
+            paid -= (paid[first] - principal[first])[segment]
+
+            chunk = {
+                "loan": loan,
+                "period": periods + self.is_arrear[loan],
+                "installment": installment[loan],
+                "principal": principal,
+                "interest": installment[loan] - principal,
+                "balance": opening[segment] - paid,
+            }
+            balance = chunk["balance"][-1]
+            yield chunk
@@ -0,0 +1,153 @@
+import numpy as np
+
+from .InterestRates import Rate
+from .YieldCurves import YieldCurve
+
+
+class CashFlows:
+    """
+        A stream of cash flows held as arrays of amounts and the times they are paid at.
+        Shifted, scaled and merged streams share the arrays of the streams they are built from; nothing is copied until 'amounts' or 'times' is read.
+    """
+
+    def __init__(self, amounts, times):
+        # Validate Entries
+        amounts = np.asarray(amounts, dtype= float)
+        times = np.asarray(times, dtype= float)
+        self.__validate_entries(amounts, times)
+
+        # segments of (amounts, times, time shift, amount scale)
+        self.__segments = ((amounts, times, 0.0, 1.0), )
+
+
+    def __validate_entries(self, amounts: np.ndarray, times: np.ndarray):
+        """
+            Validates varables values and raises errors where relevant.
+        """
+
+        # there should be one time per amount
+        if amounts.ndim != 1 or amounts.shape != times.shape:
+            raise ValueError("The cash flows are invalid. Provide one time for each amount as 1-D arrays.")
+
+
+    def __from_segments(self, segments: tuple):
+        """
+            Returns a stream made of the segments, sharing their arrays.
+        """
+
+        cash_flows = self.__class__.__new__(self.__class__)
+        cash_flows.__segments = segments
+        return cash_flows
+
+
+    def __len__(self):
+        return sum(len(amounts) for amounts, _, _, _ in self.__segments)
+
+
+    @property
+    def amounts(self):
+        """ The amounts of every cash flow, in the order the streams were merged. """
+        return np.concatenate([amounts * scale for amounts, _, _, scale in self.__segments])
+
+
+    @property
+    def times(self):
+        """ The times of every cash flow, in the order the streams were merged. """
+        return np.concatenate([times + shift for _, times, shift, _ in self.__segments])
+
+
+    def shift(self, period: float):
+        """
+            Returns the stream with every cash flow paid 'period' later (earlier for negative periods).
+        """
+
+        return self.__from_segments(tuple((amounts, times, shift + period, scale) for amounts, times, shift, scale in self.__segments))
+
+
+    def scale(self, factor: float):
+        """
+            Returns the stream with every amount multiplied by the factor, e.g. -1 for the opposite side of the stream.
+        """
+
+        return self.__from_segments(tuple((amounts, times, shift, scale * factor) for amounts, times, shift, scale in self.__segments))
+
+
+    def merge(self, *others):
+        """
+            Returns a stream holding the cash flows of this and the other streams.
+        """
+
+        segments = self.__segments
+        for other in others:
+            if not isinstance(other, CashFlows):
+                raise TypeError(f"The cash flows are invalid. They should be of type 'CashFlows' not {type(other)}.")
+            segments += other.__segments
+
+        return self.__from_segments(segments)
+
+
+    def __present_values(self, rate, at: float):
+        """
+            Yields the times (from 'at') and values at 'at' of the cash flows of each segment.
+        """
+
+        if not isinstance(rate, (Rate, YieldCurve)):
+            raise TypeError(f"The rate is invalid. It should be of type 'Rate' or 'YieldCurve' not {type(rate)}.")
+
+        for amounts, times, shift, scale in self.__segments:
+            times = times + (shift - at)
+
+            # negative periods discount, so flows after 'at' are discounted and flows before it accumulated.
+            if isinstance(rate, Rate):
+                factors = rate.time_value_factors(-times)
+            else:
+                factors = rate.time_value_factor(-times)
+
+            yield times, scale * amounts * factors
+
+
+    def npv(self, rate, at: float= 0):
+        """
+            Returns the value of the stream at time 'at' (the present value by default) against a Rate or a YieldCurve.
+        """
+
+        return float(sum(np.sum(values) for _, values in self.__present_values(rate, at)))
+
+
+    def fv(self, rate, period: float= None):
+        """
+            Returns the value of the stream at the period, by default the time of its last cash flow.
+        """
+
+        if period is None:
+            period = max((np.max(times) + shift for _, times, shift, _ in self.__segments if len(times)), default= 0)
+
+        return self.npv(rate, at= period)
+
+
+    def duration(self, rate):
+        """
+            Returns the Macaulay duration of the stream: the mean time of its cash flows weighted by present value.
+            This is also minus the derivative of the log of the present value with respect to the force of interest.
+        """
+
+        total, weighted = 0.0, 0.0
+        for times, values in self.__present_values(rate, 0):
+            total += np.sum(values)
+            weighted += np.sum(times * values)
+
+        return float(weighted / total)
+
+
+    def convexity(self, rate):
+        """
+            Returns the convexity of the stream: the mean squared time of its cash flows weighted by present value.
+            This is the second derivative of the present value with respect to the force of interest, over the present value.
+        """
+
+        total, weighted = 0.0, 0.0
+        for times, values in self.__present_values(rate, 0):
+            total += np.sum(values)
+            weighted += np.sum(times * times * values)
+
+        return float(weighted / total)
@@ -0,0 +1,121 @@
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+
+# Number of distinct strings whose parsed convention is remembered. Older strings are evicted, so strings from callers cannot grow memory.
+PARSE_CACHE_SIZE = 256
+
+
+class RateType(str, Enum):
+    """
+        The rate conventions a Rate can be converted to.
+        Members are strings, so they can be passed wherever a conversion string is accepted.
+    """
+
+    COMPOUND_INTEREST = "compound interest"
+    SIMPLE_INTEREST = "simple interest"
+    FOI = "foi"
+    COMPOUND_DISCOUNT = "compound discount"
+    SIMPLE_DISCOUNT = "simple discount"
+
+    def __str__(self):
+        return self.value
+
+
+    @classmethod
+    def parse(cls, to):
+        """
+            Returns the rate type named by the string, or None when the string names no rate type.
+        """
+
+        if isinstance(to, cls):
+            return to
+
+        # only strings name rate types
+        if not isinstance(to, str):
+            raise AssertionError(f"The rate type {to!r} is invalid. It should be a RateType or a string naming one.")
+
+        return _parse_rate_type(to)
+
+
+class PaymentMode(str, Enum):
+    """
+        The modes in which annuity installments are paid.
+        Members are strings, so they can be passed wherever a payment mode string is accepted.
+    """
+
+    ARREAR = "arrear"
+    CONTINUOUS = "continuous"
+    ADVANCE = "advance"
+
+    def __str__(self):
+        return self.value
+
+
+    @classmethod
+    def parse(cls, payment_mode):
+        """
+            Returns the payment mode named by the string, or None when the string names no payment mode.
+        """
+
+        if isinstance(payment_mode, cls):
+            return payment_mode
+
+        # only strings name payment modes
+        if not isinstance(payment_mode, str):
+            raise AssertionError(f"The payment mode {payment_mode!r} is invalid. It should be a PaymentMode or a string naming one.")
+
+        return _parse_payment_mode(payment_mode)
+
+
+    @classmethod
+    def parse_flags(cls, payment_mode):
+        """
+            Returns the is_arrear, is_continuous and is_advance flags of a column of payment modes.
+            Each distinct mode is parsed once and spread back over the column.
+        """
+
+        modes, inverse = np.unique(np.asarray(payment_mode, dtype= str), return_inverse= True)
+        flags = np.zeros((len(modes), 3), dtype= bool)
+        for index, name in enumerate(modes):
+            mode = cls.parse(name)
+            if mode is None:
+                raise AssertionError(f"The payment mode {name.lower().strip()} is invalid.\n\t\tThe valid payment modes are: 'arrear', 'continuous', 'advance'")
+            flags[index] = (mode is cls.ARREAR, mode is cls.CONTINUOUS, mode is cls.ADVANCE)
+
+        flags = flags[inverse.reshape(-1)].reshape(np.shape(payment_mode) + (3,))
+        return flags[..., 0], flags[..., 1], flags[..., 2]
+
+
+# Strings already matched to a convention are only parsed again once evicted.
+@lru_cache(maxsize= PARSE_CACHE_SIZE)
+def _parse_rate_type(to: str):
+    name = to.lower().strip()
+    rate_type = None
+    if "compound interest" in name:
+        rate_type = RateType.COMPOUND_INTEREST
+    elif "simple interest" in name:
+        rate_type = RateType.SIMPLE_INTEREST
+    elif name == "foi":
+        rate_type = RateType.FOI
+    elif "compound discount" in name:
+        rate_type = RateType.COMPOUND_DISCOUNT
+    elif "simple discount" in name:
+        rate_type = RateType.SIMPLE_DISCOUNT
+
+    return rate_type
+
+
+@lru_cache(maxsize= PARSE_CACHE_SIZE)
+def _parse_payment_mode(payment_mode: str):
+    name = payment_mode.lower().strip()
+    mode = None
+    if "arrear" in name:
+        mode = PaymentMode.ARREAR
+    elif "continuous" in name:
+        mode = PaymentMode.CONTINUOUS
+    elif ("due" in name) or ("advance" in name):
+        mode = PaymentMode.ADVANCE
+
+    return mode
@@ -0,0 +1,183 @@
+import numpy as np
+
+# NumPy binary ufuncs applied to duals through the Python operators.
+_BINARY_UFUNCS = {
+    "add": lambda left, right: left + right,
+    "subtract": lambda left, right: left - right,
+    "multiply": lambda left, right: left * right,
+    "divide": lambda left, right: left / right,
+    "power": lambda left, right: left ** right,
+}
+
+
+class Dual:
+    """
+        A dual number: a value carried together with its gradient with respect to chosen inputs (forward-mode automatic differentiation).
+        Duals pass through Rate, Annuity and VaryAnnuity calculations in place of floats, so any composed price comes back with its exact gradient.
+        Gradients are NumPy arrays with one entry per input, so every input is differentiated in a single pass.
+    """
+
+    __slots__ = ("value", "gradient")
+
+    value: float
+    gradient: np.ndarray
+
+    def __init__(self, value: float, gradient= 1.0):
+        self.value = float(value)
+        self.gradient = np.asarray(gradient, dtype= float)
+
+
+    @classmethod
+    def variables(cls, *values):
+        """
+            Returns one dual per value, each seeded with a unit gradient in its own position.
+        """
+
+        seeds = np.eye(len(values))
+        return tuple(cls(value, seed) for value, seed in zip(values, seeds))
+
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.gradient!r})"
+
+
+    def __float__(self):
+        # the gradient is dropped wherever a plain float is required.
+        return self.value
+
+
+    # Comparisons use the value, so validation and branching behave as they do for floats.
+    def __lt__(self, other):
+        return self.value < Dual.__value(other)
+
+    def __le__(self, other):
+        return self.value <= Dual.__value(other)
+
+    def __gt__(self, other):
+        return self.value > Dual.__value(other)
+
+    def __ge__(self, other):
+        return self.value >= Dual.__value(other)
+
+    def __eq__(self, other):
+        return self.value == Dual.__value(other)
+
+    def __ne__(self, other):
+        return self.value != Dual.__value(other)
+
+    __hash__ = None
+
+
+    def __value(other):
+        """
+            Returns the value of a dual or a float.
+        """
+
+        return other.value if(isinstance(other, Dual))else(other)
+
+
+    def __parts(other):
+        """
+            Returns the value and gradient of a dual or a float, whose gradient is 0.
+        """
+
+        return (other.value, other.gradient) if(isinstance(other, Dual))else(other, 0.0)
+
+
+    # Arithmetic
+    def __neg__(self):
+        return Dual(-self.value, -self.gradient)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if(self.value < 0)else(self)
+
+    def __add__(self, other):
+        value, gradient = Dual.__parts(other)
+        return Dual(self.value + value, self.gradient + gradient)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        value, gradient = Dual.__parts(other)
+        return Dual(self.value - value, self.gradient - gradient)
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, -self.gradient)
+
+    def __mul__(self, other):
+        value, gradient = Dual.__parts(other)
+        return Dual(self.value * value, self.gradient * value + self.value * gradient)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        value, gradient = Dual.__parts(other)
+        quotient = self.value / value
+        return Dual(quotient, (self.gradient - quotient * gradient) / value)
+
+    def __rtruediv__(self, other):
+        quotient = other / self.value
+        return Dual(quotient, -quotient * self.gradient / self.value)
+
+    def __pow__(self, other):
+        value, gradient = Dual.__parts(other)
+        power = self.value ** value
+
+        # d(x ** y) = y x ** (y - 1) dx + x ** y ln(x) dy
+        derivative = value * self.value ** (value - 1) * self.gradient
+        if isinstance(other, Dual):
+            derivative = derivative + power * np.log(self.value) * gradient
+        return Dual(power, derivative)
+
+    def __rpow__(self, other):
+        power = other ** self.value
+        return Dual(power, power * np.log(other) * self.gradient)
+
+
+    # Elementary functions
+    def exp(self):
+        value = np.exp(self.value)
+        return Dual(value, value * self.gradient)
+
+    def expm1(self):
+        return Dual(np.expm1(self.value), np.exp(self.value) * self.gradient)
+
+    def log(self):
+        return Dual(np.log(self.value), self.gradient / self.value)
+
+    def log1p(self):
+        return Dual(np.log1p(self.value), self.gradient / (1 + self.value))
+
+    def sqrt(self):
+        value = np.sqrt(self.value)
+        return Dual(value, self.gradient / (2 * value))
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+            Lets NumPy functions such as np.log and np.exp take duals.
+        """
+
+        if method != "__call__" or kwargs:
+            return NotImplemented
+
+        # arrays of floats are not duals, so NumPy raises a TypeError for them.
+        if any(isinstance(term, np.ndarray) and term.ndim != 0 for term in inputs):
+            return NotImplemented
+
+        if ufunc.__name__ in ("exp", "expm1", "log", "log1p", "sqrt"):
+            return getattr(inputs[0], ufunc.__name__)()
+
+        if ufunc.__name__ in _BINARY_UFUNCS:
+            left, right = (float(term) if(isinstance(term, (np.generic, np.ndarray)))else(term) for term in inputs)
+            return _BINARY_UFUNCS[ufunc.__name__](left, right)
+
+        if ufunc.__name__ == "negative":
+            return -inputs[0]
+        if ufunc.__name__ == "absolute":
+            return abs(inputs[0])
+
+        return NotImplemented
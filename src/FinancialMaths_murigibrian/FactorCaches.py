@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+
+class FactorCache:
+    """ A bounded store of time value factors that evicts the least recently used factor first. """
+
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int= 1024):
+        # the cache should hold at least one factor
+        if int(maxsize) < 1:
+            raise ValueError("The cache size is invalid. It should be a positive integer.")
+
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.__factors = OrderedDict()
+
+
+    def __len__(self):
+        return len(self.__factors)
+
+
+    def get(self, key):
+        """
+            Returns the cached factor of the key, or None when the key is not cached.
+        """
+
+        factor = self.__factors.get(key)
+        if factor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__factors.move_to_end(key)
+
+        return factor
+
+
+    def put(self, key, factor: float):
+        """
+            Stores the factor of the key and evicts the least recently used factor when full.
+        """
+
+        self.__factors[key] = factor
+        self.__factors.move_to_end(key)
+        if len(self.__factors) > self.maxsize:
+            self.__factors.popitem(last= False)
+
+
+    def clear(self):
+        """
+            Removes every cached factor and resets the counters.
+        """
+
+        self.__factors.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def cache_info(self):
+        """
+            Returns the hit and miss counters with the size of the cache.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "currsize": len(self.__factors)}
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from functools import wraps
+import json
+from time import perf_counter_ns
+
+from .Annuities import Annuity
+from .InterestRates import Rate
+from .VaryAnnuities import VaryAnnuity, VaryAnnuityMethods
+
+# Functions counted and timed while instrumentation is enabled, as (owner, attribute name).
+INSTRUMENTED = (
+    (Rate, "__init__"),
+    (Rate, "convert_to"),
+    (Rate, "time_value_factor"),
+    (Annuity, "time_value"),
+    (VaryAnnuity, "time_value"),
+    (VaryAnnuityMethods, "increasing_arrear_pv"),
+    (VaryAnnuityMethods, "increasing_advance_pv"),
+    (VaryAnnuityMethods, "increasing_continuous_pv"),
+    (VaryAnnuityMethods, "increasing_time_continuous_pv"),
+    (VaryAnnuityMethods, "geometric_pv"),
+)
+
+# [calls, nanoseconds] of each instrumented function, and the original functions replaced while enabled.
+_STATS = {}
+_ORIGINALS = {}
+
+
+class Instrumentation:
+    """
+        Opt-in call counts and timings of the hot paths in INSTRUMENTED.
+        Enabling swaps the functions for timed wrappers and disabling restores them, so nothing is measured (or paid for) while disabled.
+        Times are inclusive: a function's time contains the time of the instrumented functions it calls.
+    """
+
+    def timed(name: str, function):
+        """
+            Returns a wrapper of the function that adds its calls and elapsed time to the stats of the name.
+        """
+
+        stats = _STATS.setdefault(name, [0, 0])
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter_ns() - start
+
+        return wrapper
+
+
+    def is_enabled():
+        """
+            Returns whether the hot paths are instrumented.
+        """
+
+        return bool(_ORIGINALS)
+
+
+    def enable():
+        """
+            Starts counting and timing the hot paths. Stats gathered before are kept.
+        """
+
+        for owner, attribute in INSTRUMENTED:
+            if (owner, attribute) not in _ORIGINALS:
+                function = owner.__dict__[attribute]
+                _ORIGINALS[(owner, attribute)] = function
+                setattr(owner, attribute, Instrumentation.timed(f"{owner.__name__}.{attribute}", function))
+
+
+    def disable():
+        """
+            Stops counting and restores the original functions. Stats are kept until reset.
+        """
+
+        for (owner, attribute), function in _ORIGINALS.items():
+            setattr(owner, attribute, function)
+        _ORIGINALS.clear()
+
+
+    def reset():
+        """
+            Sets every count and time back to zero.
+        """
+
+        for stats in _STATS.values():
+            stats[0] = 0
+            stats[1] = 0
+
+
+    @contextmanager
+    def profile():
+        """
+            Instruments the hot paths for the duration of a with block, from zeroed stats.
+        """
+
+        Instrumentation.reset()
+        Instrumentation.enable()
+        try:
+            yield
+        finally:
+            Instrumentation.disable()
+
+
+    def summary():
+        """
+            Returns the calls, total and mean seconds of every function called, slowest first.
+        """
+
+        profile = {
+            name: {"calls": calls, "total_seconds": elapsed / 1e9, "mean_seconds": elapsed / calls / 1e9}
+            for name, (calls, elapsed) in sorted(_STATS.items(), key= lambda item: -item[1][1]) if calls
+        }
+        return profile
+
+
+    def report():
+        """
+            Returns the summary as a table.
+        """
+
+        lines = [f"{'function':<45} {'calls':>12} {'total (s)':>12} {'mean (us)':>12}"]
+        for name, stats in Instrumentation.summary().items():
+            lines.append(f"{name:<45} {stats['calls']:>12,} {stats['total_seconds']:>12.6f} {stats['mean_seconds'] * 1e6:>12.3f}")
+
+        return "\n".join(lines)
+
+
+    def export(path: str):
+        """
+            Writes the summary to a JSON file.
+        """
+
+        with open(path, "w") as file:
+            json.dump(Instrumentation.summary(), file, indent= 2)
@@ -1,7 +1,23 @@
-from math import log, exp
+import math
+
+import numpy as np
+
+
+# Python scalars use math, so rates outside the domain still raise ValueError and results stay floats.
+# Arrays (and duals) use the NumPy ufuncs.
+def _log(value):
+    return math.log(value) if(isinstance(value, (int, float)))else(np.log(value))
+
+
+def _exp(value):
+    return math.exp(value) if(isinstance(value, (int, float)))else(np.exp(value))
+
 
 class AccumulationRateMethods:
-    """Contains methods for converting to and from effecive interest rates and accumualtion factors"""
+    """
+        Contains methods for converting to and from effecive interest rates and accumualtion factors.
+        All methods accept floats or NumPy arrays; arrays are broadcast over rates and periods.
+    """
 
     def simple_factor(simple_ir: float, period: float):
         """
@@ -65,7 +81,7 @@ class AccumulationRateMethods:
             Retruns the effective interest rate from the force of interest(foi).
         """
 
-        rate = exp(foi_rate) - 1
+        rate = _exp(foi_rate) - 1
         return rate
 
         
@@ -74,7 +90,7 @@ class AccumulationRateMethods:
             Returns force of interest(foi) from the effective interest rate.
         """
 
-        foi_rate = log(1 + eff_rate)
+        foi_rate = _log(1 + eff_rate)
         return foi_rate
 
 
@@ -116,7 +132,10 @@ class AccumulationRateMethods:
 
 
 class DiscountRateMethods:
-    """ Contains methods for converting to and from effecive discounting interest rates """
+    """
+        Contains methods for converting to and from effecive discounting interest rates.
+        All methods accept floats or NumPy arrays; arrays are broadcast over rates and periods.
+    """
 
     def simple_factor(simple_dr: float, period: float):
         """
@@ -175,7 +194,7 @@ class DiscountRateMethods:
             Retruns the effective interest rate from the force of interest(foi).
         """
 
-        rate = 1 - exp(- foi_rate) 
+        rate = 1 - _exp(- foi_rate) 
         return rate
 
         
@@ -184,7 +203,7 @@ class DiscountRateMethods:
             Returns force of interest(foi) from the effective interest rate.
         """
 
-        foi_rate = -log(1 - eff_rate)
+        foi_rate = -_log(1 - eff_rate)
         return foi_rate
 
 
@@ -1,42 +1,96 @@
+import numpy as np
+
+from .Duals import Dual
+from .FactorCaches import FactorCache
+from .Conventions import RateType
 from .InterestRateMethods import AccumulationRateMethods, DiscountRateMethods
 
 
+# Conversion of a rate to a target type, keyed by (is simple rate, target type).
+# The conversions only read 'interest_rate' and 'discount_rate', so they serve Rate and RateBatch alike.
+RATE_CONVERSIONS = {
+    # conversions of simple interest rates
+    (True, RateType.COMPOUND_INTEREST): lambda rate, period: AccumulationRateMethods.effective_from_simple(rate.interest_rate, simple_period= period),
+    (True, RateType.SIMPLE_DISCOUNT): lambda rate, period: AccumulationRateMethods.simple_interest_to_discounting(rate.interest_rate, period),
+
+    # conversions of compound interest rates
+    (False, RateType.COMPOUND_INTEREST): lambda rate, period: AccumulationRateMethods.effective_to_norminal(rate.interest_rate, period),
+    (False, RateType.SIMPLE_INTEREST): lambda rate, period: AccumulationRateMethods.effective_to_simple(rate.interest_rate, compound_period= period),
+    (False, RateType.FOI): lambda rate, period: AccumulationRateMethods.effective_to_foi(rate.interest_rate),
+    (False, RateType.COMPOUND_DISCOUNT): lambda rate, period: DiscountRateMethods.effective_to_norminal(rate.discount_rate, period),
+    (False, RateType.SIMPLE_DISCOUNT): lambda rate, period: DiscountRateMethods.effective_to_simple(rate.discount_rate, compound_period= period),
+}
+
+
 class Rate:
     """ A class that contains properties and functions for working with rates.  """
 
-    is_simple_rate: bool = False
-    is_foi: bool = False
-    is_discount_rate: bool = False
+    __slots__ = ("raw_rate", "is_simple_rate", "is_foi", "is_discount_rate", "norminal_period", "interest_rate", "discount_rate", "foi", "factor_cache", "factor_step", "accumulation_table", "discount_table")
+
+    raw_rate: float
+    is_simple_rate: bool
+    is_foi: bool
+    is_discount_rate: bool
+    norminal_period: float
 
-    interest_rate: float = 0
-    discount_rate: float = 0
-    foi: float = 0
+    # derived on first access, then held like any other attribute.
+    interest_rate: float
+    discount_rate: float
+    foi: float
+
+    factor_cache: FactorCache
+
+    factor_step: float
+    accumulation_table: np.ndarray
+    discount_table: np.ndarray
 
     def __init__(self, raw_rate:float, norminal_period: float= 1, is_foi: bool= False, is_simple: bool= False, is_discount: bool= False):
         self.is_simple_rate = bool(is_simple)
         self.is_discount_rate = bool(is_discount)
         self.is_foi = bool(is_foi)
         self.norminal_period = float(norminal_period)
+
+        # no factors are cached or tabulated until requested.
+        self.factor_cache = None
+        self.factor_step = None
+        self.accumulation_table = None
+        self.discount_table = None
         
         # Validate Entries
-        self.__validate_entries(raw_rate)
-        raw_rate = float(raw_rate)
+        self.raw_rate = self.__validate_entries(raw_rate)
 
-        # provide a value for the core rate(simple or effective).
-        if(self.is_simple_rate):
-            self.__to_simple_rates(raw_rate )
-        else:
-            self.__to_effective_rates(raw_rate)
+
+    @classmethod
+    def trusted(cls, raw_rate: float, norminal_period: float= 1.0, is_foi: bool= False, is_simple: bool= False, is_discount: bool= False):
+        """
+            Returns a rate built without validation or conversion, for pre-validated inputs (e.g. float columns already checked as a RateBatch).
+            The inputs should already be a non-negative float rate, a positive float period and bool flags.
+        """
+
+        rate = cls.__new__(cls)
+        rate.raw_rate = raw_rate
+        rate.norminal_period = norminal_period
+        rate.is_foi = is_foi
+        rate.is_simple_rate = is_simple
+        rate.is_discount_rate = is_discount
+
+        rate.factor_cache = None
+        rate.factor_step = None
+        rate.accumulation_table = None
+        rate.discount_table = None
+
+        return rate
 
         
     def __validate_entries(self, raw_rate: float):
         """ 
             Validates varables values and raises errors where relevant. 
+            Returns the rate as a float (duals are kept).
         """
 
         # Rate should be a float value.        
         try:
-            raw_rate = float(raw_rate)
+            raw_rate = raw_rate if(isinstance(raw_rate, Dual))else(float(raw_rate))
         except ValueError:
             raise ValueError("The rate provided is invalid. Use a positive float value.")
         
@@ -48,104 +102,180 @@ class Rate:
         if self.norminal_period < 0:
             raise ValueError("The norminal time period is invalid. It should be a positive float value.")
 
+        return raw_rate
+
 
-    def __to_effective_rates(self, raw_rate):
+    def __getattr__(self, name):
         """
-            Returns effective interest and discount rates from the provided rate as the core rates.
+            Derives the interest rate, discount rate or force of interest on first access and keeps it.
+            Only called for attributes that are not set yet.
         """
 
-        disc_rate = None
-        int_rate = None
-        foi = None
+        if name == "interest_rate":
+            value = self.__derive_interest_rate()
+        elif name == "discount_rate":
+            value = self.__derive_discount_rate()
+        elif name == "foi":
+            value = self.__derive_foi()
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        object.__setattr__(self, name, value)
+        return value
+
+
+    def __derive_interest_rate(self):
+        """
+            Returns the effective (or simple) interest rate of the provided rate.
+        """
+
+        if self.is_simple_rate:
+            # simple rates from the discount or interest rate
+            return DiscountRateMethods.simple_discount_to_interest(self.raw_rate) if(self.is_discount_rate)else(self.raw_rate)
+
         if self.is_discount_rate:
             # generate effective rates from discount rate
-            disc_rate = DiscountRateMethods.effective_from_norminal(raw_rate, norminal_period= self.norminal_period)
-            int_rate = DiscountRateMethods.discount_to_accumulation(disc_rate)
-            foi = DiscountRateMethods.effective_to_foi(disc_rate)
+            return DiscountRateMethods.discount_to_accumulation(self.discount_rate)
 
-        elif self.is_foi:
+        if self.is_foi:
             # generate effective rates from force of interest.
-            int_rate = AccumulationRateMethods.effective_from_foi(raw_rate)
-            disc_rate = AccumulationRateMethods.accumulation_to_discount(int_rate)
-            foi = AccumulationRateMethods.effective_to_foi(int_rate)
-        else:   
-            # generate effective rates from intrest rate
-            int_rate = AccumulationRateMethods.effective_from_norminal(raw_rate, norminal_period= self.norminal_period)
-            disc_rate = AccumulationRateMethods.accumulation_to_discount(int_rate)
-            foi = AccumulationRateMethods.effective_to_foi(int_rate)
+            return AccumulationRateMethods.effective_from_foi(self.raw_rate)
 
-        self.interest_rate = int_rate
-        self.foi = foi
-        self.discount_rate = disc_rate
+        # generate effective rates from intrest rate
+        return AccumulationRateMethods.effective_from_norminal(self.raw_rate, norminal_period= self.norminal_period)
 
-        return (int_rate, foi, disc_rate)
 
+    def __derive_discount_rate(self):
+        """
+            Returns the effective (or simple) discount rate of the provided rate.
+        """
 
-    def __to_simple_rates(self, raw_rate):
-        """ 
-            Returns simple interest and discount rates from the provided rate as the core rates.
+        if self.is_simple_rate:
+            # simple rates from the discount or interest rate
+            return self.raw_rate if(self.is_discount_rate)else(AccumulationRateMethods.simple_interest_to_discounting(self.raw_rate))
+
+        if self.is_discount_rate:
+            # generate effective rates from discount rate
+            return DiscountRateMethods.effective_from_norminal(self.raw_rate, norminal_period= self.norminal_period)
+
+        return AccumulationRateMethods.accumulation_to_discount(self.interest_rate)
+
+
+    def __derive_foi(self):
         """
-        
-        disc_rate = None
-        int_rate = None
+            Returns the force of interest of the provided rate, 0 for simple rates.
+        """
+
+        if self.is_simple_rate:
+            return 0
+
         if self.is_discount_rate:
-            # generate simple rates from discount rate
-            disc_rate = raw_rate
-            int_rate = DiscountRateMethods.simple_discount_to_interest(raw_rate)
-        
-        else:
-            # generate effective rates from intrest rate
-            int_rate = raw_rate
-            disc_rate = AccumulationRateMethods.simple_interest_to_discounting(raw_rate)
-        
-        self.interest_rate = int_rate
-        self.discount_rate = disc_rate
-        return (int_rate, disc_rate)
+            return DiscountRateMethods.effective_to_foi(self.discount_rate)
+
+        return AccumulationRateMethods.effective_to_foi(self.interest_rate)
+
+
+    def enable_cache(self, maxsize: int= 1024, cache: FactorCache= None):
+        """
+            Caches the time value factors of the rate in a bounded LRU cache and returns the cache.
+            Passing an existing cache shares it between rates.
+        """
+
+        self.factor_cache = FactorCache(maxsize) if(cache is None)else(cache)
+        return self.factor_cache
+
 
-    def __convert_simple(self, to: str, simple_period: float= 1):
+    def disable_cache(self):
         """
-            Handles conversions in simple interest rates.
+            Stops caching the time value factors of the rate.
         """
 
-        rate = None
-        if "compound interest" in to:
-            rate = AccumulationRateMethods.effective_from_simple(self.interest_rate, simple_period= simple_period)
-        elif "simple discount" in to:
-            rate = AccumulationRateMethods.simple_interest_to_discounting(self.interest_rate, simple_period)
+        self.factor_cache = None
+
+
+    def build_factor_table(self, step: float, horizon: float):
+        """
+            Precomputes accumulation and discount factors for every multiple of 'step' up to 'horizon'.
+            Factors of periods on the grid are then looked up from the tables.
+        """
+
+        # the grid should be regular and non-empty
+        if step <= 0 or horizon < 0:
+            raise ValueError("The table grid is invalid. The step should be positive and the horizon non-negative.")
+
+        size = int(round(horizon / step)) + 1
+        if self.is_simple_rate:
+            periods = np.arange(size) * step
+            accumulation = AccumulationRateMethods.simple_factor(self.interest_rate, periods)
+            discount = DiscountRateMethods.simple_factor(self.discount_rate, periods)
         else:
-            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for simple interest are: 'compound interest', 'simple discount'")
-        return rate
+            # factors are built by repeated multiplication of the single step factor
+            accumulation = np.cumprod(np.r_[1.0, np.full(size - 1, AccumulationRateMethods.compound_factor(self.interest_rate, step))])
+            discount = np.cumprod(np.r_[1.0, np.full(size - 1, DiscountRateMethods.compound_factor(self.discount_rate, step))])
 
+        self.factor_step = float(step)
+        self.accumulation_table = accumulation
+        self.discount_table = discount
 
-    def __convert_compound(self, to: str, compound_period: float= 1):
+
+    def drop_factor_table(self):
         """
-            Handles conversions in compound interest rates.
+            Removes the precomputed factor tables.
         """
 
-        rate = None
-        if "compound interest" in to:
-            # conver to norminal intrest
-            rate = AccumulationRateMethods.effective_to_norminal(self.interest_rate, compound_period)
-        
-        elif "simple interest" in to:
-            # conver to simple intrest
-            rate = AccumulationRateMethods.effective_to_simple(self.interest_rate, compound_period= compound_period)
-
-        elif to == "foi":
-            # convert to force of interest
-            rate = AccumulationRateMethods.effective_to_foi(self.interest_rate)
-
-        elif "compound discount" in to:
-            # convert to (norminal or effective) discoount rate
-            rate = DiscountRateMethods.effective_to_norminal(self.discount_rate, compound_period)
-
-        elif "simple discount" in to:
-            # conver to simple discount
-            rate = DiscountRateMethods.effective_to_simple(self.discount_rate, compound_period= compound_period)
-        else: 
-            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for compound interest are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount' ")
+        self.factor_step = None
+        self.accumulation_table = None
+        self.discount_table = None
 
-        return rate
+
+    def table_factor(self, index, discount: bool= False):
+        """
+            Returns the precomputed factor(s) at the grid index (or array of indices).
+        """
+
+        if self.factor_step is None:
+            raise AssertionError("No factor table has been built. Call 'build_factor_table' first.")
+
+        table = self.discount_table if(discount)else(self.accumulation_table)
+        return table[index]
+
+
+    def __table_index(self, periods):
+        """
+            Returns the grid indices of the periods, or None when a period is off the grid or past the horizon.
+        """
+
+        position = np.abs(periods) / self.factor_step
+        index = np.rint(position)
+        on_grid = np.abs(position - index) < 1e-9
+        if not np.all(on_grid & (index < len(self.accumulation_table))):
+            return None
+
+        return index.astype(int)
+
+
+    def time_value_factors(self, periods, discount: bool= False):
+        """
+            Returns the time value factors of an array of periods.
+            The factor tables are used when every period is on the grid.
+        """
+
+        periods = np.asarray(periods, dtype= float)
+        use_discount = np.logical_or(discount, periods < 0)
+
+        if self.factor_step is not None:
+            index = self.__table_index(periods)
+            if index is not None:
+                return np.where(use_discount, self.discount_table[index], self.accumulation_table[index])
+
+        if self.is_simple_rate:
+            # time value of simple interest and discount rates
+            factor = np.where(use_discount, DiscountRateMethods.simple_factor(self.discount_rate, np.abs(periods)), AccumulationRateMethods.simple_factor(self.interest_rate, periods))
+        else:
+            # time value of compound interest and discount rates
+            factor = np.where(use_discount, DiscountRateMethods.compound_factor(self.discount_rate, np.abs(periods)), AccumulationRateMethods.compound_factor(self.interest_rate, periods))
+
+        return factor
 
 
     def time_value_factor(self, period:float, discount: bool= False):
@@ -153,6 +283,32 @@ class Rate:
             Returns the time value factor (accumulating and discounting factors) of the effective and simple interest rates
         """
 
+        # periods on the grid of a factor table are looked up
+        if self.factor_step is not None:
+            position = abs(period) / self.factor_step
+            index = round(position)
+            if abs(position - index) < 1e-9 and index < len(self.accumulation_table):
+                table = self.discount_table if(discount or (period < 0))else(self.accumulation_table)
+                return table.item(index)
+
+        if self.factor_cache is None or isinstance(self.interest_rate, Dual):
+            return self.__time_value_factor(period, discount)
+
+        # factors are keyed by the rate, the period and the direction.
+        key = (self.is_simple_rate, self.interest_rate, abs(period), discount or (period < 0))
+        factor = self.factor_cache.get(key)
+        if factor is None:
+            factor = self.__time_value_factor(period, discount)
+            self.factor_cache.put(key, factor)
+
+        return factor
+
+
+    def __time_value_factor(self, period:float, discount: bool= False):
+        """
+            Computes the time value factor of the rate.
+        """
+
         factor = None
         if self.is_simple_rate:
             # time value of simple interest and discount rates
@@ -174,15 +330,97 @@ class Rate:
     def convert_to(self, to: str, norminal_period: float= 1):
         """
             Returns an equivalent rate based on the effective interest and the parameters provided of interest.  
+            'to' is a RateType or a string naming one.
         """       
 
-        to = to.lower().strip()
+        conversion = RATE_CONVERSIONS.get((self.is_simple_rate, RateType.parse(to)))
+        if conversion is None:
+            to = str(to).lower().strip()
+            if self.is_simple_rate:
+                raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for simple interest are: 'compound interest', 'simple discount'")
+            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for compound interest are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount' ")
 
-        rate = None
-        if self.is_simple_rate:
-            rate = self.__convert_simple(to, simple_period= norminal_period)
-        else:
-            rate = self.__convert_compound(to, compound_period= norminal_period)
+        return conversion(self, norminal_period)
+
+
+
+class FrozenRate(Rate):
+    """
+        An immutable Rate that can be deduplicated and used as a dict key.
+        Rates are equal when they are of the same kind and share the same effective interest rate.
+        Conversions are memoized per target and norminal period.
+    """
+
+    __slots__ = ("__conversions",)
+
+    def __init__(self, raw_rate:float, norminal_period: float= 1, is_foi: bool= False, is_simple: bool= False, is_discount: bool= False):
+        super().__init__(raw_rate, norminal_period= norminal_period, is_foi= is_foi, is_simple= is_simple, is_discount= is_discount)
+
+        # the rate is frozen once the conversions store exists.
+        object.__setattr__(self, "_FrozenRate__conversions", {})
+
+
+    @classmethod
+    def trusted(cls, raw_rate: float, norminal_period: float= 1.0, is_foi: bool= False, is_simple: bool= False, is_discount: bool= False):
+        """
+            Returns a frozen rate built without validation or conversion, for pre-validated inputs.
+        """
+
+        rate = super().trusted(raw_rate, norminal_period= norminal_period, is_foi= is_foi, is_simple= is_simple, is_discount= is_discount)
+        object.__setattr__(rate, "_FrozenRate__conversions", {})
+        return rate
+
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_FrozenRate__conversions"):
+            raise AttributeError(f"Cannot set '{name}'. FrozenRate objects are immutable.")
+        object.__setattr__(self, name, value)
+
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Cannot delete '{name}'. FrozenRate objects are immutable.")
+
+
+    def __setstate__(self, state):
+        for name, value in state[1].items():
+            object.__setattr__(self, name, value)
+
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenRate):
+            return NotImplemented
+        return (self.is_simple_rate, self.interest_rate) == (other.is_simple_rate, other.interest_rate)
+
+
+    def __hash__(self):
+        return hash((self.is_simple_rate, self.interest_rate))
+
+
+    def __repr__(self):
+        kind = "simple" if(self.is_simple_rate)else("compound")
+        return f"FrozenRate({kind} interest_rate={self.interest_rate!r})"
+
+
+    def convert_to(self, to: str, norminal_period: float= 1):
+        """
+            Returns an equivalent rate based on the effective interest and the parameters provided of interest.
+            Results are memoized per (to, norminal_period). Array or unhashable norminal periods are converted without the memo.
+        """
+
+        # unknown targets raise from the conversion itself.
+        rate_type = RateType.parse(to)
+        if rate_type is None or np.ndim(norminal_period) != 0:
+            return super().convert_to(to, norminal_period= norminal_period)
+
+        key = (rate_type, norminal_period)
+        try:
+            rate = self.__conversions.get(key)
+        except TypeError:
+            return super().convert_to(to, norminal_period= norminal_period)
+
+        if rate is None:
+            rate = super().convert_to(to, norminal_period= norminal_period)
+            self.__conversions[key] = rate
 
         return rate
 
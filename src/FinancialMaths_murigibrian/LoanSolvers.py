@@ -0,0 +1,76 @@
+import numpy as np
+
+from .Conventions import PaymentMode, RateType
+from .RateBatches import RateBatch
+
+
+class LoanSolver:
+    """
+        Solves loan installments and terms from the closed-form annuity factors.
+        Every argument is a column and they are broadcast together, so a whole quote grid is solved in one array operation.
+        Deferral is at the loan's own rate, as in Annuity.time_value.
+    """
+
+    def denominator(annuity_rate: RateBatch, payment_mode= "arrear", norminal_period= 1):
+        """
+            Returns the denominators of the annuity factors: the norminal interest (arrear), norminal discount (advance) or force of interest (continuous) rate.
+            A unit annuity of term n is worth (1 - discount factor of n) / denominator.
+        """
+
+        if not isinstance(annuity_rate, RateBatch):
+            raise TypeError(f"The annuity rate is invalid. It should be of type 'RateBatch' not {type(annuity_rate)}.")
+
+        is_arrear, is_continuous, is_advance = PaymentMode.parse_flags(payment_mode)
+        norminal_period = np.asarray(norminal_period, dtype= float)
+
+        # only the conversions used by some cell of the grid are evaluated.
+        denominator = 0.0
+        if is_arrear.any():
+            denominator = np.where(is_arrear, annuity_rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= norminal_period), denominator)
+        if is_advance.any():
+            denominator = np.where(is_advance, annuity_rate.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= norminal_period), denominator)
+        if is_continuous.any():
+            denominator = np.where(is_continuous, annuity_rate.foi, denominator)
+
+        return denominator
+
+
+    def solve_installment(annuity_rate: RateBatch, loan_amount= 1, payment_mode= "arrear", annuity_term= 1, norminal_period= 1, differ_period= 0):
+        """
+            Returns the installments (amounts per year) that repay the loans. Matches loan_amount / Annuity.time_value(differ_period= differ_period) cell by cell.
+            Zero rates repay the loan in equal parts.
+        """
+
+        denominator = LoanSolver.denominator(annuity_rate, payment_mode, norminal_period)
+        annuity_term = np.asarray(annuity_term, dtype= float)
+
+        # loan * denominator / (1 - discount factor), grown by the inverse of the deferral's discount factor as Annuity.time_value discounts it
+        amortized = 1 - annuity_rate.time_value_factor(annuity_term, discount= True)
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            installment = np.where(denominator == 0, 1 / annuity_term, denominator / amortized)
+
+        with np.errstate(divide= "ignore"):
+            return loan_amount * installment / annuity_rate.time_value_factor(differ_period, discount= True)
+
+
+    def solve_term(annuity_rate: RateBatch, loan_amount= 1, installment= 1, payment_mode= "arrear", norminal_period= 1, differ_period= 0):
+        """
+            Returns the (fractional) terms over which the installments (amounts per year) repay the loans.
+            Inverts solve_installment. Terms are NaN where the installments never repay the loans.
+        """
+
+        denominator = LoanSolver.denominator(annuity_rate, payment_mode, norminal_period)
+
+        # share of the loan value left for the discount factor of the term to cover
+        with np.errstate(divide= "ignore"):
+            loan_amount = loan_amount / annuity_rate.time_value_factor(differ_period, discount= True)
+        amortized = loan_amount * denominator / installment
+
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            # discount factor of n: (1 - d) ** n for compound rates and 1 - d * n for simple rates.
+            compound_term = -np.log1p(-amortized) / -np.log1p(-annuity_rate.discount_rate)
+            simple_term = amortized / annuity_rate.discount_rate
+            term = np.where(annuity_rate.is_simple_rate, simple_term, compound_term)
+            term = np.where(denominator == 0, loan_amount / installment, term)
+
+        return np.where((amortized < 1) & (term >= 0), term, np.nan)
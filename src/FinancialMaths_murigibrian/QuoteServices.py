@@ -0,0 +1,183 @@
+import asyncio
+from functools import partial
+
+import numpy as np
+
+from .Annuities import Annuity
+from .InterestRates import Rate
+from .ValuationRunners import ValuationRunner
+
+# Seconds a request waits for others to join its batch, and the most requests priced in one batch.
+QUOTE_WINDOW = 0.002
+QUOTE_BATCH_SIZE = 1024
+
+
+class QuoteService:
+    """
+        An asyncio front end that prices annuity quotes in batches.
+        Requests are gathered for up to 'window' seconds or until 'max_batch' are waiting, then priced as one contract table with ValuationRunner.
+        Each caller gets the value Annuity(Rate(...), ...).time_value(differ_period, is_fv) would return, or the error its own request raises.
+        Requests the batch cannot price, or prices to a non-finite value, are priced alone through Rate and Annuity for that reason.
+        Batches are priced on the event loop, or in 'executor' (a thread or process pool) when one is given.
+    """
+
+    window: float
+    max_batch: int
+    executor: object
+
+    def __init__(self, window: float= QUOTE_WINDOW, max_batch: int= QUOTE_BATCH_SIZE, executor= None):
+        # batches should wait a non-negative time and hold at least one request
+        if window < 0 or int(max_batch) < 1:
+            raise ValueError("The service is invalid. The window should be non-negative and the batch size a positive integer.")
+
+        self.window = float(window)
+        self.max_batch = int(max_batch)
+        self.executor = executor
+
+        self.__pending = []
+        self.__timer = None
+        self.__in_flight = set()
+
+
+    def __len__(self):
+        return len(self.__pending)
+
+
+    async def quote(self, raw_rate: float, payment_mode: str= "arrear", annuity_term: float= 1, annuity_amount: float= 1, norminal_period: float= 1, differ_period: float= 0,
+                    rate_norminal_period: float= 1, is_foi: bool= False, is_simple: bool= False, is_discount: bool= False, is_fv: bool= False):
+        """
+            Returns the time value of an annuity, priced with the other requests of its batch.
+            The arguments are those of Rate and Annuity, with the rate's norminal period as 'rate_norminal_period'.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__pending.append(((raw_rate, payment_mode, annuity_term, annuity_amount, norminal_period, differ_period, rate_norminal_period, is_foi, is_simple, is_discount, is_fv), future))
+
+        # a full batch is priced at once, otherwise the first request of a batch starts its window.
+        if len(self.__pending) >= self.max_batch:
+            self.flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+
+    def flush(self):
+        """
+            Prices the waiting requests now, without waiting for the window to close.
+        """
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+        batch, self.__pending = self.__pending, []
+        if not batch:
+            return
+
+        requests = [request for request, _ in batch]
+        futures = [future for _, future in batch]
+        if self.executor is None:
+            QuoteService.resolve(futures, QuoteService.price_requests(requests))
+        else:
+            priced = asyncio.get_running_loop().run_in_executor(self.executor, QuoteService.price_requests, requests)
+            self.__in_flight.add(priced)
+            priced.add_done_callback(self.__in_flight.discard)
+            priced.add_done_callback(partial(QuoteService.settle, futures))
+
+
+    async def close(self):
+        """
+            Prices the waiting requests and waits until every batch sent to the executor is resolved.
+        """
+
+        self.flush()
+        if self.__in_flight:
+            await asyncio.gather(*self.__in_flight, return_exceptions= True)
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *exception):
+        await self.close()
+
+
+    def resolve(futures: list, results: list):
+        """
+            Sets each future to its value, or to its error. Futures cancelled by their callers are skipped.
+        """
+
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+    def settle(futures: list, priced: asyncio.Future):
+        """
+            Resolves the futures of a batch priced in the executor with its values, or with its error.
+            When the batch is cancelled, so are the futures still waiting on it.
+        """
+
+        if priced.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+
+        error = priced.exception()
+        QuoteService.resolve(futures, priced.result() if(error is None)else([error] * len(futures)))
+
+
+    def price_requests(requests: list):
+        """
+            Returns the value (or error) of every request, pricing them as one contract table.
+            When the table cannot be priced, or a value is not finite (such as a zero rate), those requests are priced alone with Annuity, so they get its value or error.
+        """
+
+        try:
+            results = QuoteService.price_table(requests).tolist()
+        except Exception:
+            results = [np.nan] * len(requests)
+
+        for index, value in enumerate(results):
+            if not np.isfinite(value):
+                results[index] = QuoteService.price_request(requests[index])
+
+        return results
+
+
+    def price_request(request: tuple):
+        """
+            Returns the value of a single request priced with Rate and Annuity, or the error it raises.
+        """
+
+        raw_rate, payment_mode, annuity_term, annuity_amount, norminal_period, differ_period, rate_norminal_period, is_foi, is_simple, is_discount, is_fv = request
+        try:
+            rate = Rate(raw_rate, norminal_period= rate_norminal_period, is_foi= is_foi, is_simple= is_simple, is_discount= is_discount)
+            return Annuity(rate, payment_mode, annuity_term, annuity_amount, norminal_period).time_value(differ_period= differ_period, is_fv= is_fv)
+        except Exception as error:
+            return error
+
+
+    def price_table(requests: list):
+        """
+            Returns the values of the requests, with future and present values priced as separate groups.
+        """
+
+        columns = list(zip(*requests))
+        contracts = ValuationRunner.contract_table(*columns[:-1])
+        is_fv = np.asarray(columns[-1], dtype= bool)
+
+        values = np.empty(len(requests))
+        for flag in (False, True):
+            rows = is_fv == flag
+            if rows.any():
+                values[rows] = ValuationRunner.price_contracts(contracts[rows], is_fv= flag)
+
+        return values
@@ -0,0 +1,160 @@
+import numpy as np
+
+from .Conventions import RateType
+from .InterestRateMethods import AccumulationRateMethods, DiscountRateMethods
+from .InterestRates import RATE_CONVERSIONS
+
+
+class RateBatch:
+    """ An array-backed companion to Rate. Holds many rates as contiguous float64 columns. """
+
+    raw_rate: np.ndarray
+    norminal_period: np.ndarray
+    is_simple_rate: np.ndarray
+    is_foi: np.ndarray
+    is_discount_rate: np.ndarray
+
+    interest_rate: np.ndarray
+    discount_rate: np.ndarray
+    foi: np.ndarray
+
+    def __init__(self, raw_rate, norminal_period= 1, is_foi= False, is_simple= False, is_discount= False):
+        # Validate Entries
+        raw_rate = self.__validate_entries(raw_rate, norminal_period)
+
+        # every column shares the shape of the broadcast inputs.
+        columns = np.broadcast_arrays(raw_rate, np.asarray(norminal_period, dtype= float), np.asarray(is_foi, dtype= bool), np.asarray(is_simple, dtype= bool), np.asarray(is_discount, dtype= bool))
+        self.raw_rate, self.norminal_period, self.is_foi, self.is_simple_rate, self.is_discount_rate = (np.ascontiguousarray(column) for column in columns)
+
+        self.__to_core_rates()
+
+
+    def __len__(self):
+        return len(self.interest_rate)
+
+
+    def __getitem__(self, index):
+        """
+            Returns the selected rows as a RateBatch. Slices share memory with this batch.
+        """
+
+        batch = self.__class__.__new__(self.__class__)
+        for column in ("raw_rate", "norminal_period", "is_foi", "is_simple_rate", "is_discount_rate", "interest_rate", "discount_rate", "foi"):
+            setattr(batch, column, getattr(self, column)[index])
+        return batch
+
+
+    def __validate_entries(self, raw_rate, norminal_period):
+        """
+            Validates varables values and raises errors where relevant.
+        """
+
+        # Rates should be float values.
+        try:
+            raw_rate = np.asarray(raw_rate, dtype= float)
+        except ValueError:
+            raise ValueError("The rates provided are invalid. Use positive float values.")
+
+        # rates should be non-negative
+        if np.any(raw_rate < 0):
+            raise ValueError("The provided rates are invalid. They should be positive float values.")
+
+        # norminal time should be positive
+        if np.any(np.asarray(norminal_period, dtype= float) < 0):
+            raise ValueError("The norminal time periods are invalid. They should be positive float values.")
+
+        return raw_rate
+
+
+    def __to_core_rates(self):
+        """
+            Fills the interest, discount and foi columns the same way Rate does for each row.
+        """
+
+        raw_rate = self.raw_rate
+        int_rate = np.empty_like(raw_rate)
+        disc_rate = np.empty_like(raw_rate)
+        foi = np.zeros_like(raw_rate)
+
+        simple = self.is_simple_rate
+        discount = ~simple & self.is_discount_rate
+        force = ~simple & ~self.is_discount_rate & self.is_foi
+        interest = ~simple & ~self.is_discount_rate & ~self.is_foi
+
+        # generate simple rates from discount rate
+        rows = simple & self.is_discount_rate
+        disc_rate[rows] = raw_rate[rows]
+        int_rate[rows] = DiscountRateMethods.simple_discount_to_interest(raw_rate[rows])
+
+        # generate simple rates from interest rate
+        rows = simple & ~self.is_discount_rate
+        int_rate[rows] = raw_rate[rows]
+        disc_rate[rows] = AccumulationRateMethods.simple_interest_to_discounting(raw_rate[rows])
+
+        # generate effective rates from discount rate
+        disc_rate[discount] = DiscountRateMethods.effective_from_norminal(raw_rate[discount], norminal_period= self.norminal_period[discount])
+        int_rate[discount] = DiscountRateMethods.discount_to_accumulation(disc_rate[discount])
+        foi[discount] = DiscountRateMethods.effective_to_foi(disc_rate[discount])
+
+        # generate effective rates from force of interest.
+        int_rate[force] = AccumulationRateMethods.effective_from_foi(raw_rate[force])
+        disc_rate[force] = AccumulationRateMethods.accumulation_to_discount(int_rate[force])
+        foi[force] = AccumulationRateMethods.effective_to_foi(int_rate[force])
+
+        # generate effective rates from intrest rate
+        int_rate[interest] = AccumulationRateMethods.effective_from_norminal(raw_rate[interest], norminal_period= self.norminal_period[interest])
+        disc_rate[interest] = AccumulationRateMethods.accumulation_to_discount(int_rate[interest])
+        foi[interest] = AccumulationRateMethods.effective_to_foi(int_rate[interest])
+
+        self.interest_rate = int_rate
+        self.discount_rate = disc_rate
+        self.foi = foi
+
+
+    def time_value_factor(self, period, discount: bool= False):
+        """
+            Returns the time value factors of every row. Matches Rate.time_value_factor row by row.
+        """
+
+        period = np.asarray(period, dtype= float)
+        use_discount = np.logical_or(discount, period < 0)
+
+        # time value of compound interest and discount rates
+        factor = DiscountRateMethods.compound_factor(self.discount_rate, np.abs(period))
+        if not discount:
+            factor = np.where(use_discount, factor, AccumulationRateMethods.compound_factor(self.interest_rate, period))
+
+        # time value of simple interest and discount rates
+        if self.is_simple_rate.any():
+            simple_factor = np.where(use_discount, DiscountRateMethods.simple_factor(self.discount_rate, np.abs(period)), AccumulationRateMethods.simple_factor(self.interest_rate, period))
+            factor = np.where(self.is_simple_rate, simple_factor, factor)
+
+        return factor
+
+
+    def convert_to(self, to: str, norminal_period= 1):
+        """
+            Returns the equivalent rates of every row. Matches Rate.convert_to row by row.
+            'to' is a RateType or a string naming one.
+        """
+
+        rate_type = RateType.parse(to)
+        has_simple = self.is_simple_rate.any()
+        has_compound = not self.is_simple_rate.all()
+
+        # every kind of rate in the batch should support the conversion.
+        to = str(to).lower().strip()
+        if has_simple and (True, rate_type) not in RATE_CONVERSIONS:
+            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for simple interest are: 'compound interest', 'simple discount'")
+        if has_compound and (False, rate_type) not in RATE_CONVERSIONS:
+            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for compound interest are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount' ")
+
+        rate = None
+        if not has_compound:
+            rate = RATE_CONVERSIONS[(True, rate_type)](self, norminal_period)
+        elif not has_simple:
+            rate = RATE_CONVERSIONS[(False, rate_type)](self, norminal_period)
+        else:
+            rate = np.where(self.is_simple_rate, RATE_CONVERSIONS[(True, rate_type)](self, norminal_period), RATE_CONVERSIONS[(False, rate_type)](self, norminal_period))
+
+        return rate
@@ -0,0 +1,129 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .Conventions import RateType
+from .InterestRateMethods import AccumulationRateMethods, DiscountRateMethods
+from .InterestRates import RATE_CONVERSIONS
+
+# The interest and discount rate columns of a group of rates, in the form the RATE_CONVERSIONS kernels read.
+CoreRates = namedtuple("CoreRates", ("interest_rate", "discount_rate"))
+
+# Conventions in the order of their codes, as returned by RateConverter.convention_codes.
+CONVENTIONS = tuple(RateType)
+
+# Kernels returning the core rates of raw rates quoted in each convention with their norminal periods, as Rate derives them.
+CORE_RATE_KERNELS = {
+    RateType.COMPOUND_INTEREST: lambda raw_rate, period: RateConverter.from_interest(AccumulationRateMethods.effective_from_norminal(raw_rate, norminal_period= period)),
+    RateType.COMPOUND_DISCOUNT: lambda raw_rate, period: RateConverter.from_discount(DiscountRateMethods.effective_from_norminal(raw_rate, norminal_period= period)),
+    RateType.FOI: lambda raw_rate, period: RateConverter.from_interest(AccumulationRateMethods.effective_from_foi(raw_rate)),
+    RateType.SIMPLE_INTEREST: lambda raw_rate, period: CoreRates(raw_rate, AccumulationRateMethods.simple_interest_to_discounting(raw_rate)),
+    RateType.SIMPLE_DISCOUNT: lambda raw_rate, period: CoreRates(DiscountRateMethods.simple_discount_to_interest(raw_rate), raw_rate),
+}
+
+
+class RateConverter:
+    """
+        Converts whole tables of rates quoted in mixed conventions to one target convention.
+        Rows are grouped by their convention, so each group is converted by one array operation of AccumulationRateMethods and DiscountRateMethods.
+        Matches Rate(...).convert_to(to, norminal_period) row by row.
+    """
+
+    def from_interest(interest_rate):
+        """
+            Returns the core rates of effective interest rates.
+        """
+
+        return CoreRates(interest_rate, AccumulationRateMethods.accumulation_to_discount(interest_rate))
+
+
+    def from_discount(discount_rate):
+        """
+            Returns the core rates of effective discount rates.
+        """
+
+        return CoreRates(DiscountRateMethods.discount_to_accumulation(discount_rate), discount_rate)
+
+
+    def convention_codes(conventions):
+        """
+            Returns the index in CONVENTIONS of the convention of every row.
+            Each distinct name is parsed once and spread back over the column. Integer columns are taken as codes already.
+        """
+
+        if np.asarray(conventions).dtype.kind in "iu":
+            codes = np.asarray(conventions)
+            if np.any((codes < 0) | (codes >= len(CONVENTIONS))):
+                raise AssertionError(f"The rate convention codes are invalid. They should be indices of {len(CONVENTIONS)} conventions.")
+            return codes
+
+        names, inverse = np.unique(np.asarray(conventions, dtype= str), return_inverse= True)
+        codes = np.empty(len(names), dtype= np.int8)
+        for index, name in enumerate(names):
+            rate_type = RateType.parse(name)
+            if rate_type is None:
+                raise AssertionError(f"The rate convention {name.lower().strip()} is invalid.\n\t\tThe valid rate conventions are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount'")
+            codes[index] = CONVENTIONS.index(rate_type)
+
+        return codes[inverse.reshape(-1)].reshape(np.shape(conventions))
+
+
+    def convert_group(raw_rate: np.ndarray, convention: RateType, to: RateType, norminal_period, to_norminal_period):
+        """
+            Returns the rates of a group quoted in one convention, converted to the target convention.
+        """
+
+        is_simple = convention in (RateType.SIMPLE_INTEREST, RateType.SIMPLE_DISCOUNT)
+        conversion = RATE_CONVERSIONS.get((is_simple, to))
+        if conversion is None:
+            if is_simple:
+                raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for simple interest are: 'compound interest', 'simple discount'")
+            raise AssertionError(f"Cannot convert to type '{to}'. \n\t\tValid convertion types for compound interest are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount' ")
+
+        return conversion(CORE_RATE_KERNELS[convention](raw_rate, norminal_period), to_norminal_period)
+
+
+    def convert_table(raw_rate, conventions, to, norminal_period= 1, to_norminal_period= 1):
+        """
+            Returns the rates of the table converted to the 'to' convention with norminal period 'to_norminal_period'.
+            'conventions' names the convention each raw rate is quoted in (a RateType or a string naming one), as a column or one convention for the whole table.
+            A column of codes (indices in CONVENTIONS) skips parsing the names.
+            'norminal_period' holds the norminal periods of compound quotes; simple quotes ignore it, as in Rate.
+        """
+
+        # Rates should be non-negative floats with positive norminal periods.
+        try:
+            raw_rate = np.asarray(raw_rate, dtype= float)
+        except ValueError:
+            raise ValueError("The rates provided are invalid. Use positive float values.")
+
+        if np.any(raw_rate < 0):
+            raise ValueError("The provided rates are invalid. They should be positive float values.")
+
+        if np.any(np.asarray(norminal_period, dtype= float) < 0) or np.any(np.asarray(to_norminal_period, dtype= float) < 0):
+            raise ValueError("The norminal time periods are invalid. They should be positive float values.")
+
+        to = RateType.parse(to)
+        if to is None:
+            raise AssertionError("Cannot convert to the requested type. \n\t\tValid convertion types are: 'compound interest', 'simple interest', 'foi', 'compound discount', 'simple discount'")
+
+        # a table quoted in a single convention is one group.
+        if np.ndim(conventions) == 0:
+            convention = RateType.parse(conventions)
+            if convention is None:
+                RateConverter.convention_codes([conventions])
+            return RateConverter.convert_group(raw_rate, convention, to, norminal_period, to_norminal_period)
+
+        codes = RateConverter.convention_codes(conventions)
+        shape = np.broadcast_shapes(raw_rate.shape, codes.shape, np.shape(norminal_period), np.shape(to_norminal_period))
+        raw_rate = np.broadcast_to(raw_rate, shape)
+        codes = np.broadcast_to(codes, shape)
+        norminal_period = np.broadcast_to(np.asarray(norminal_period, dtype= float), shape)
+        to_norminal_period = np.broadcast_to(np.asarray(to_norminal_period, dtype= float), shape)
+
+        rates = np.empty(shape)
+        for code in np.flatnonzero(np.bincount(codes.reshape(-1), minlength= len(CONVENTIONS))):
+            rows = codes == code
+            rates[rows] = RateConverter.convert_group(raw_rate[rows], CONVENTIONS[code], to, norminal_period[rows], to_norminal_period[rows])
+
+        return rates
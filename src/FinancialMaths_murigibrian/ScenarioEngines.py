@@ -0,0 +1,151 @@
+from multiprocessing import Pool
+
+import numpy as np
+
+from .AnnuityDerivatives import AnnuityDerivativeMethods
+from .AnnuityPortfolios import AnnuityPortfolio
+
+# Contract-scenario cells priced together, bounding the memory of each block to a few arrays of this many floats.
+SCENARIO_BLOCK_CELLS = 2 ** 21
+
+# Portfolio priced by each worker, sent once when the worker starts.
+_WORKER_STATE = {}
+
+
+class ScenarioEngine:
+    """
+        Reprices a portfolio of annuities under many parallel shifts of their effective interest rates.
+        Values form a contracts x scenarios matrix, priced in blocks of scenarios with closed-form formulas in the shifted force of interest.
+        Shifted rates are not validated, so shocks may take rates below zero (but not to -100% or below).
+    """
+
+    portfolio: AnnuityPortfolio
+    base_amount: np.ndarray
+    vary_amount: np.ndarray
+    is_time_continuous: np.ndarray
+    differ_period: np.ndarray
+    block_cells: int
+
+    def __init__(self, portfolio: AnnuityPortfolio, base_amount= 1, vary_amount= 0, is_time_continuous= False, differ_period= 0, block_cells: int= SCENARIO_BLOCK_CELLS):
+        if not isinstance(portfolio, AnnuityPortfolio):
+            raise TypeError(f"The portfolio is invalid. It should be of type 'AnnuityPortfolio' not {type(portfolio)}.")
+
+        # shifts apply to effective interest rates, which simple rates do not have.
+        if portfolio.annuity_rate.is_simple_rate.any():
+            raise ValueError("The portfolio rates are invalid. Scenarios shift compound rates only.")
+
+        self.portfolio = portfolio
+
+        # varying contracts follow VaryAnnuity: (base - vary) * amount level payments plus vary increasing payments.
+        size = len(portfolio)
+        self.base_amount = np.broadcast_to(np.asarray(base_amount, dtype= float), size)
+        self.vary_amount = np.broadcast_to(np.asarray(vary_amount, dtype= float), size)
+        self.is_time_continuous = np.broadcast_to(np.asarray(is_time_continuous, dtype= bool), size)
+        self.differ_period = np.broadcast_to(np.asarray(differ_period, dtype= float), size)
+        self.block_cells = int(block_cells)
+
+
+    def __scenario_blocks(self, shifts: np.ndarray):
+        """
+            Returns the (start, stop) bounds of the scenario blocks.
+        """
+
+        block_size = max(1, self.block_cells // max(len(self.portfolio), 1))
+        return [(start, min(start + block_size, len(shifts))) for start in range(0, len(shifts), block_size)]
+
+
+    def __validate_shifts(self, shifts):
+        """
+            Returns the shifts as a scenarios x contracts matrix, or a column of parallel shifts shared by all contracts.
+        """
+
+        shifts = np.asarray(shifts, dtype= float)
+        if shifts.ndim == 1:
+            shifts = shifts[:, None]
+
+        if shifts.ndim != 2 or shifts.shape[1] not in (1, len(self.portfolio)):
+            raise ValueError("The scenario shifts are invalid. Provide one shift per scenario, or one per scenario and contract.")
+
+        return shifts
+
+
+    def price_block(self, shifts: np.ndarray, is_fv: bool= False):
+        """
+            Returns the contracts x scenarios values of a block of shifts (scenarios x contracts, or a column of parallel shifts).
+        """
+
+        portfolio = self.portfolio
+        column = lambda values: values[:, None]
+        foi = np.log1p(column(portfolio.annuity_rate.interest_rate) + shifts.T)
+
+        level = np.all(self.vary_amount == 0) and not np.any(self.is_time_continuous)
+        if level:
+            values = AnnuityDerivativeMethods.annuity_pv(foi, column(portfolio.is_arrear), column(portfolio.is_advance), column(portfolio.annuity_term), column(self.base_amount * portfolio.annuity_amount), column(portfolio.norminal_period), column(self.differ_period), is_fv= is_fv)[0]
+        else:
+            values = AnnuityDerivativeMethods.vary_annuity_pv(foi, column(self.base_amount), column(self.vary_amount), column(self.is_time_continuous), column(portfolio.is_arrear), column(portfolio.is_advance), column(portfolio.annuity_term), column(portfolio.annuity_amount), column(portfolio.norminal_period), column(self.differ_period), is_fv= is_fv)[0]
+
+        return values
+
+
+    def iter_present_values(self, shifts, is_fv: bool= False):
+        """
+            Yields (start, values) for each block of scenarios, with values a contracts x block matrix.
+            Only one block is held in memory at a time.
+        """
+
+        shifts = self.__validate_shifts(shifts)
+        for start, stop in self.__scenario_blocks(shifts):
+            yield start, self.price_block(shifts[start:stop], is_fv= is_fv)
+
+
+    def attach(engine):
+        """
+            Keeps the engine of a worker.
+        """
+
+        _WORKER_STATE["engine"] = engine
+
+
+    def price_worker_block(bounds: tuple):
+        """
+            Prices a block of scenarios with the engine of the worker.
+        """
+
+        shifts, is_fv = bounds
+        return _WORKER_STATE["engine"].price_block(shifts, is_fv= is_fv)
+
+
+    def present_values(self, shifts, is_fv: bool= False, processes: int= 1):
+        """
+            Returns the contracts x scenarios matrix of values under the shifts.
+            Blocks of scenarios are priced over a pool of processes when more than one is requested.
+        """
+
+        shifts = self.__validate_shifts(shifts)
+        values = np.empty((len(self.portfolio), len(shifts)))
+        blocks = self.__scenario_blocks(shifts)
+
+        if processes > 1 and len(blocks) > 1:
+            # blocks are returned in order, so values do not depend on the processes.
+            with Pool(min(processes, len(blocks)), initializer= ScenarioEngine.attach, initargs= (self, )) as pool:
+                results = pool.imap(ScenarioEngine.price_worker_block, [(shifts[start:stop], is_fv) for start, stop in blocks])
+                for (start, stop), block in zip(blocks, results):
+                    values[:, start:stop] = block
+        else:
+            for start, stop in blocks:
+                values[:, start:stop] = self.price_block(shifts[start:stop], is_fv= is_fv)
+
+        return values
+
+
+    def portfolio_values(self, shifts, is_fv: bool= False):
+        """
+            Returns the total value of the portfolio under each scenario, without holding the full contracts x scenarios matrix.
+        """
+
+        shifts = self.__validate_shifts(shifts)
+        totals = np.empty(len(shifts))
+        for start, block in self.iter_present_values(shifts, is_fv= is_fv):
+            totals[start:start + block.shape[1]] = block.sum(axis= 0)
+
+        return totals
@@ -0,0 +1,181 @@
+import numpy as np
+
+# Number of paths generated together. A batch of paths over 480 periods holds about 40MB per array.
+SIMULATION_BATCH_SIZE = 10000
+
+
+class LognormalRates:
+    """
+        Independent, identically distributed rates per period, where 1 + i is lognormally distributed.
+        Each period's force of interest, ln(1 + i), is normal with mean 'mu' and standard deviation 'sigma'.
+    """
+
+    mu: float
+    sigma: float
+
+    def __init__(self, mu: float, sigma: float):
+        # the standard deviation should be non-negative
+        if sigma < 0:
+            raise ValueError("The standard deviation is invalid. It should be a positive float value.")
+
+        self.mu = float(mu)
+        self.sigma = float(sigma)
+
+
+    @classmethod
+    def from_moments(cls, mean: float, variance: float):
+        """
+            Returns the model whose effective rates per period have the mean and variance.
+        """
+
+        # moments of the lognormal 1 + i
+        sigma_2 = np.log1p(variance / (1 + mean) ** 2)
+        return cls(np.log1p(mean) - sigma_2 / 2, np.sqrt(sigma_2))
+
+
+    def sample_foi(self, generator: np.random.Generator, paths: int, periods: int):
+        """
+            Returns the forces of interest of each path (row) and period (column).
+        """
+
+        return self.mu + self.sigma * generator.standard_normal((paths, periods))
+
+
+class AR1Rates:
+    """
+        Forces of interest following an AR(1) process: foi_t = mean + phi * (foi_t-1 - mean) + sigma * Z_t.
+        Each period's force of interest applies over that period.
+    """
+
+    mean: float
+    phi: float
+    sigma: float
+    initial: float
+
+    def __init__(self, mean: float, phi: float, sigma: float, initial: float= None):
+        # the process should be stationary with a non-negative volatility
+        if abs(phi) >= 1 or sigma < 0:
+            raise ValueError("The AR(1) parameters are invalid. Use |phi| < 1 and a positive sigma.")
+
+        self.mean = float(mean)
+        self.phi = float(phi)
+        self.sigma = float(sigma)
+        self.initial = self.mean if(initial is None)else(float(initial))
+
+
+    @classmethod
+    def vasicek(cls, speed: float, mean: float, volatility: float, initial: float= None, step: float= 1):
+        """
+            Returns the exact discretization, over periods of length 'step', of the Vasicek model d(foi) = speed * (mean - foi) dt + volatility dW.
+            The forces of interest are per unit time, so 'step' should match the period length used when discounting.
+        """
+
+        phi = np.exp(-speed * step)
+        sigma = volatility * np.sqrt(-np.expm1(-2 * speed * step) / (2 * speed))
+        return cls(mean, phi, sigma, initial)
+
+
+    def sample_foi(self, generator: np.random.Generator, paths: int, periods: int):
+        """
+            Returns the forces of interest of each path (row) and period (column), stepping all paths together.
+        """
+
+        noise = self.sigma * generator.standard_normal((paths, periods))
+        foi = np.empty((paths, periods))
+        previous = np.full(paths, self.initial)
+        for period in range(periods):
+            previous = self.mean + self.phi * (previous - self.mean) + noise[:, period]
+            foi[:, period] = previous
+
+        return foi
+
+
+class RateSimulation:
+    """
+        Simulates paths of a stochastic rate model in batches and values annuities along them.
+        Paths are drawn from one seeded NumPy Generator in order, so the same seed gives the same paths whatever the batch size.
+    """
+
+    model: object
+    periods: int
+    step: float
+    seed: int
+    batch_size: int
+
+    def __init__(self, model, periods: int, step: float= 1, seed: int= None, batch_size: int= SIMULATION_BATCH_SIZE):
+        # the model should sample forces of interest
+        if not isinstance(model, (LognormalRates, AR1Rates)):
+            raise TypeError(f"The model is invalid. It should be of type 'LognormalRates' or 'AR1Rates' not {type(model)}.")
+
+        if int(periods) < 1 or step <= 0 or int(batch_size) < 1:
+            raise ValueError("The simulation is invalid. The periods, step and batch size should be positive.")
+
+        self.model = model
+        self.periods = int(periods)
+        self.step = float(step)
+        self.seed = seed
+        self.batch_size = int(batch_size)
+
+
+    def iter_foi(self, paths: int):
+        """
+            Yields the forces of interest of each batch of paths, as batch x periods arrays.
+        """
+
+        generator = np.random.default_rng(self.seed)
+        for start in range(0, paths, self.batch_size):
+            yield self.model.sample_foi(generator, min(self.batch_size, paths - start), self.periods)
+
+
+    def discount_factors(self, foi: np.ndarray):
+        """
+            Returns the discount factors from time 0 to the end of each period along each path.
+        """
+
+        return np.exp(-np.cumsum(foi * self.step, axis= 1))
+
+
+    def iter_annuity_pvs(self, paths: int, amounts= 1, is_advance: bool= False, is_fv: bool= False):
+        """
+            Yields the values of an annuity along each batch of paths.
+            'amounts' are paid at the end of each period (or at its start in advance), as a scalar or one amount per period.
+        """
+
+        amounts = np.broadcast_to(np.asarray(amounts, dtype= float), self.periods)
+        for foi in self.iter_foi(paths):
+            discount = self.discount_factors(foi)
+            to_end = discount[:, -1]
+
+            # payments in advance are discounted to the end of the previous period.
+            if is_advance:
+                discount = np.hstack((np.ones((len(discount), 1)), discount[:, :-1]))
+
+            # every path of the batch is valued in one reduction
+            values = discount @ amounts
+            yield values / to_end if(is_fv)else(values)
+
+
+    def annuity_pvs(self, paths: int, amounts= 1, is_advance: bool= False, is_fv: bool= False):
+        """
+            Returns the value of an annuity along each path. The paths themselves are only held one batch at a time.
+        """
+
+        return np.concatenate(list(self.iter_annuity_pvs(paths, amounts, is_advance, is_fv)))
+
+
+    def annuity_pv_moments(self, paths: int, amounts= 1, is_advance: bool= False, is_fv: bool= False):
+        """
+            Returns the mean and standard deviation of the value of an annuity across the paths, accumulated batch by batch.
+        """
+
+        count, mean, squares = 0, 0.0, 0.0
+        for values in self.iter_annuity_pvs(paths, amounts, is_advance, is_fv):
+            # batch moments are pooled so no batch is kept once it is counted
+            batch_mean = np.mean(values)
+            batch_squares = np.sum((values - batch_mean) ** 2)
+            total = count + len(values)
+            squares += batch_squares + (batch_mean - mean) ** 2 * count * len(values) / total
+            mean += (batch_mean - mean) * len(values) / total
+            count = total
+
+        return float(mean), float(np.sqrt(squares / count))
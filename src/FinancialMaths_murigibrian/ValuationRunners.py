@@ -0,0 +1,248 @@
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+import os
+
+import numpy as np
+
+from .AnnuityPortfolios import AnnuityPortfolio
+from .Conventions import PaymentMode
+from .RateBatches import RateBatch
+
+# Number of contracts priced together by a worker.
+VALUATION_CHUNK_SIZE = 65536
+
+# One row per contract. Payment modes are stored as their index in PAYMENT_MODE_CODES so rows have a fixed size.
+CONTRACT_DTYPE = np.dtype([
+    ("raw_rate", "f8"),
+    ("rate_norminal_period", "f8"),
+    ("is_foi", "?"),
+    ("is_simple", "?"),
+    ("is_discount", "?"),
+    ("payment_mode", "i1"),
+    ("annuity_term", "f8"),
+    ("annuity_amount", "f8"),
+    ("norminal_period", "f8"),
+    ("differ_period", "f8"),
+])
+PAYMENT_MODE_CODES = np.array([PaymentMode.ARREAR.value, PaymentMode.CONTINUOUS.value, PaymentMode.ADVANCE.value])
+
+# Contract and value files with this suffix are NumPy .npy files; any other file is the raw rows with no header.
+NPY_SUFFIX = ".npy"
+
+# Shared memory views (or memory-mapped files) attached once by each worker and reused for every chunk it prices.
+_WORKER_STATE = {}
+
+
+class ValuationRunner:
+    """
+        Prices a table of annuity contracts in chunks over a pool of processes.
+        Contracts and values are passed through shared memory; workers only receive the bounds of the chunks they price.
+        Values are written at the positions of their contracts, so they depend only on the table and the chunk size, not on the processes.
+        Tables too large for memory can be priced from a memory-mapped contract file into a memory-mapped value file.
+    """
+
+    processes: int
+    chunk_size: int
+
+    def __init__(self, processes: int= None, chunk_size: int= VALUATION_CHUNK_SIZE):
+        # at least one process should price chunks of at least one contract
+        processes = os.cpu_count() if(processes is None)else(int(processes))
+        if processes < 1 or int(chunk_size) < 1:
+            raise ValueError("The runner is invalid. The processes and chunk size should be positive integers.")
+
+        self.processes = processes
+        self.chunk_size = int(chunk_size)
+
+
+    def contract_table(raw_rate, payment_mode= "arrear", annuity_term= 1, annuity_amount= 1, norminal_period= 1, differ_period= 0, rate_norminal_period= 1, is_foi= False, is_simple= False, is_discount= False):
+        """
+            Returns a CONTRACT_DTYPE table built from columns of contract properties. Scalars are shared by all contracts.
+        """
+
+        is_arrear, is_continuous, is_advance = PaymentMode.parse_flags(payment_mode)
+        columns = np.broadcast_arrays(np.asarray(raw_rate, dtype= float), np.where(is_arrear, 0, np.where(is_continuous, 1, 2)), annuity_term, annuity_amount, norminal_period, differ_period, rate_norminal_period, is_foi, is_simple, is_discount)
+
+        contracts = np.empty(columns[0].size, dtype= CONTRACT_DTYPE)
+        for name, column in zip(("raw_rate", "payment_mode", "annuity_term", "annuity_amount", "norminal_period", "differ_period", "rate_norminal_period", "is_foi", "is_simple", "is_discount"), columns):
+            contracts[name] = column.ravel()
+
+        return contracts
+
+
+    def price_contracts(contracts: np.ndarray, is_fv: bool= False):
+        """
+            Returns the time values of the contracts in a CONTRACT_DTYPE table, priced as one AnnuityPortfolio.
+        """
+
+        rate = RateBatch(contracts["raw_rate"], norminal_period= contracts["rate_norminal_period"], is_foi= contracts["is_foi"], is_simple= contracts["is_simple"], is_discount= contracts["is_discount"])
+        portfolio = AnnuityPortfolio(rate, PAYMENT_MODE_CODES[contracts["payment_mode"]], contracts["annuity_term"], contracts["annuity_amount"], contracts["norminal_period"])
+
+        return portfolio.time_value(differ_period= contracts["differ_period"], is_fv= is_fv)
+
+
+    def attach(contracts_name: str, values_name: str, size: int):
+        """
+            Attaches a worker to the shared contract table and value array.
+        """
+
+        contracts_memory = SharedMemory(name= contracts_name)
+        values_memory = SharedMemory(name= values_name)
+        _WORKER_STATE["memory"] = (contracts_memory, values_memory)
+        _WORKER_STATE["contracts"] = np.ndarray(size, dtype= CONTRACT_DTYPE, buffer= contracts_memory.buf)
+        _WORKER_STATE["values"] = np.ndarray(size, dtype= float, buffer= values_memory.buf)
+
+
+    def attach_files(contracts_path: str, values_path: str):
+        """
+            Attaches a worker to the contract and value files, keeping only their paths and the byte offsets of their first rows.
+        """
+
+        _WORKER_STATE["files"] = ((contracts_path, ValuationRunner.open_contracts(contracts_path).offset), (values_path, ValuationRunner.open_values(values_path).offset))
+
+
+    def price_file_chunk(bounds: tuple):
+        """
+            Prices the contracts between the bounds of the attached contract file and writes their values to the value file.
+            Only the rows of the chunk are mapped, and they are unmapped once priced, so memory stays bounded by the chunk size.
+        """
+
+        start, stop, is_fv = bounds
+        (contracts_path, contracts_offset), (values_path, values_offset) = _WORKER_STATE["files"]
+
+        contracts = np.memmap(contracts_path, dtype= CONTRACT_DTYPE, mode= "r", offset= contracts_offset + start * CONTRACT_DTYPE.itemsize, shape= (stop - start, ))
+        values = np.memmap(values_path, dtype= float, mode= "r+", offset= values_offset + start * 8, shape= (stop - start, ))
+        values[:] = ValuationRunner.price_contracts(contracts, is_fv= is_fv)
+        values.flush()
+        return start
+
+
+    def open_contracts(path: str):
+        """
+            Returns a read-only memory map of a contract file: a .npy file of a CONTRACT_DTYPE table, or raw CONTRACT_DTYPE rows.
+            Rows are only read from disk when a chunk of them is priced.
+        """
+
+        if str(path).endswith(NPY_SUFFIX):
+            contracts = np.load(path, mmap_mode= "r")
+        else:
+            # a raw file should hold whole rows.
+            size, remainder = divmod(os.path.getsize(path), CONTRACT_DTYPE.itemsize)
+            if remainder:
+                raise ValueError(f"The contract file is invalid. Its size should be a multiple of the {CONTRACT_DTYPE.itemsize} bytes of a row.")
+            contracts = np.memmap(path, dtype= CONTRACT_DTYPE, mode= "r", shape= (size, )) if(size)else(np.empty(0, dtype= CONTRACT_DTYPE))
+
+        if contracts.dtype != CONTRACT_DTYPE or contracts.ndim != 1:
+            raise TypeError(f"The contracts are invalid. They should be an array of dtype 'CONTRACT_DTYPE' not {contracts.dtype}.")
+
+        return contracts
+
+
+    def create_values(path: str, size: int):
+        """
+            Creates a value file of 'size' floats (a .npy file or raw float64s) and returns its writable memory map.
+        """
+
+        if str(path).endswith(NPY_SUFFIX):
+            return np.lib.format.open_memmap(path, mode= "w+", dtype= float, shape= (size, ))
+
+        if not size:
+            open(path, "wb").close()
+            return np.empty(0)
+        return np.memmap(path, dtype= float, mode= "w+", shape= (size, ))
+
+
+    def open_values(path: str):
+        """
+            Returns the writable memory map of a value file created by create_values.
+        """
+
+        if str(path).endswith(NPY_SUFFIX):
+            return np.load(path, mmap_mode= "r+")
+        return np.memmap(path, dtype= float, mode= "r+")
+
+
+    def write_contracts(path: str, contracts: np.ndarray):
+        """
+            Writes a CONTRACT_DTYPE table to a contract file (a .npy file or raw rows), which can be appended to when raw.
+        """
+
+        contracts = np.asarray(contracts)
+        if contracts.dtype != CONTRACT_DTYPE:
+            raise TypeError(f"The contracts are invalid. They should be an array of dtype 'CONTRACT_DTYPE' not {contracts.dtype}.")
+
+        if str(path).endswith(NPY_SUFFIX):
+            np.save(path, contracts)
+        else:
+            contracts.tofile(path)
+
+
+    def price_chunk(bounds: tuple):
+        """
+            Prices the contracts between the bounds of the attached table and writes their values in place.
+        """
+
+        start, stop, is_fv = bounds
+        _WORKER_STATE["values"][start:stop] = ValuationRunner.price_contracts(_WORKER_STATE["contracts"][start:stop], is_fv= is_fv)
+        return start
+
+
+    def run(self, contracts: np.ndarray, is_fv: bool= False):
+        """
+            Returns the time values of every contract in a CONTRACT_DTYPE table, in the order of the table.
+        """
+
+        contracts = np.asarray(contracts)
+        if contracts.dtype != CONTRACT_DTYPE:
+            raise TypeError(f"The contracts are invalid. They should be an array of dtype 'CONTRACT_DTYPE' not {contracts.dtype}.")
+
+        size = len(contracts)
+        chunks = [(start, min(start + self.chunk_size, size), bool(is_fv)) for start in range(0, size, self.chunk_size)]
+        if self.processes == 1 or len(chunks) < 2:
+            # no pool is needed for a single process or chunk.
+            return np.concatenate([ValuationRunner.price_contracts(contracts[start:stop], is_fv) for start, stop, is_fv in chunks]) if(chunks)else(np.empty(0))
+
+        contracts_memory = SharedMemory(create= True, size= max(contracts.nbytes, 1))
+        values_memory = SharedMemory(create= True, size= max(size * 8, 1))
+        try:
+            np.ndarray(size, dtype= CONTRACT_DTYPE, buffer= contracts_memory.buf)[:] = contracts
+            with Pool(min(self.processes, len(chunks)), initializer= ValuationRunner.attach, initargs= (contracts_memory.name, values_memory.name, size)) as pool:
+                for _ in pool.imap_unordered(ValuationRunner.price_chunk, chunks):
+                    pass
+
+            values = np.ndarray(size, dtype= float, buffer= values_memory.buf).copy()
+        finally:
+            contracts_memory.close()
+            contracts_memory.unlink()
+            values_memory.close()
+            values_memory.unlink()
+
+        return values
+
+
+    def run_file(self, contracts_path: str, values_path: str, is_fv: bool= False):
+        """
+            Prices every contract of a contract file and writes the values, in the order of the file, to a new value file.
+            Both files are memory mapped and priced chunk by chunk, so memory is bounded by the chunk size and processes, not by the file.
+            Returns the read-only memory map of the values.
+        """
+
+        size = len(ValuationRunner.open_contracts(contracts_path))
+        ValuationRunner.create_values(values_path, size)
+        chunks = [(start, min(start + self.chunk_size, size), bool(is_fv)) for start in range(0, size, self.chunk_size)]
+
+        if self.processes > 1 and len(chunks) > 1:
+            # every worker maps the chunks it prices itself, so only the bounds of the chunks are sent.
+            with Pool(min(self.processes, len(chunks)), initializer= ValuationRunner.attach_files, initargs= (contracts_path, values_path)) as pool:
+                for _ in pool.imap_unordered(ValuationRunner.price_file_chunk, chunks):
+                    pass
+        elif chunks:
+            ValuationRunner.attach_files(contracts_path, values_path)
+            try:
+                for chunk in chunks:
+                    ValuationRunner.price_file_chunk(chunk)
+            finally:
+                _WORKER_STATE.pop("files")
+
+        if str(values_path).endswith(NPY_SUFFIX):
+            return np.load(values_path, mmap_mode= "r")
+        return np.memmap(values_path, dtype= float, mode= "r") if(size)else(np.empty(0))
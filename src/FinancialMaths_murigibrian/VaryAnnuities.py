@@ -1,20 +1,27 @@
+import numpy as np
+
+from .AnnuityDerivatives import AnnuityDerivativeMethods
 from .Annuities import Annuity
+from .CashFlows import CashFlows
+from .Conventions import RateType
 from .InterestRates import Rate
+from .YieldCurves import YieldCurve
 
 class VaryAnnuityMethods:
     def increasing_arrear_pv(annuity_arrear: Annuity):
         """
             Returns the present value of a increasing annuity arrear.
+            The amount steps up by one each year and is paid in installments over the year's norminal periods.
         """
 
         # annuity Props
         rate = annuity_arrear.annuity_rate
-        to_adv_factor = rate.convert_to("compound interest", norminal_period= annuity_arrear.norminal_period) / rate.convert_to("compound discount", norminal_period= annuity_arrear.norminal_period)
         disc_factor = rate.time_value_factor(annuity_arrear.annuity_term, discount= True)
-        advance_pv = annuity_arrear.arrear_pv * to_adv_factor       
+        # amounts step up once a year, so the yearly annuity due is used whatever the norminal period
+        advance_pv = (1 - disc_factor) / rate.convert_to(RateType.COMPOUND_DISCOUNT)
 
         # varying annuity arrears present value
-        inc_arrear_pv = (advance_pv - (annuity_arrear.annuity_term * disc_factor))/rate.interest_rate
+        inc_arrear_pv = (advance_pv - (annuity_arrear.annuity_term * disc_factor)) / rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= annuity_arrear.norminal_period)
 
         return inc_arrear_pv
 
@@ -26,7 +33,7 @@ class VaryAnnuityMethods:
         # annuity props
         rate = annuity_advance.annuity_rate
         vary_arrear = VaryAnnuityMethods.increasing_arrear_pv(annuity_advance)
-        to_adv_factor = rate.convert_to("compound interest", norminal_period= annuity_advance.norminal_period) / rate.convert_to("compound discount", norminal_period= annuity_advance.norminal_period)
+        to_adv_factor = rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= annuity_advance.norminal_period) / rate.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= annuity_advance.norminal_period)
 
         # varying annuity due present value
         inc_adv_pv = vary_arrear * to_adv_factor
@@ -40,7 +47,7 @@ class VaryAnnuityMethods:
         # annuity props
         rate = annuity_continuous.annuity_rate
         vary_arrear = VaryAnnuityMethods.increasing_arrear_pv(annuity_continuous)
-        to_cont_factor = rate.convert_to("compound interest", norminal_period= annuity_continuous.norminal_period) / rate.foi
+        to_cont_factor = rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= annuity_continuous.norminal_period) / rate.foi
 
         # varying annuity due present value
         inc_adv_pv = vary_arrear * to_cont_factor
@@ -55,7 +62,7 @@ class VaryAnnuityMethods:
 
         # annuity Props
         rate = annuity_continuous.annuity_rate
-        to_cont_factor = rate.convert_to("compound interest", norminal_period= annuity_continuous.norminal_period) / rate.foi
+        to_cont_factor = rate.convert_to(RateType.COMPOUND_INTEREST, norminal_period= annuity_continuous.norminal_period) / rate.foi
         disc_factor = rate.time_value_factor(annuity_continuous.annuity_term, discount= True)
         continuous_pv = annuity_continuous.arrear_pv * to_cont_factor
 
@@ -65,6 +72,47 @@ class VaryAnnuityMethods:
         return inc_time_cont_pv 
 
 
+    def geometric_growth_factor(adjusted_foi, annuity_term, is_time_continuous= False):
+        """
+            Returns the present value, at the growth adjusted force of interest, of a yearly annuity due (or of a continuous annuity when time continuous).
+            The adjusted force of interest (foi - ln(1 + growth rate)) discounts the growth out of the payments and may be negative.
+            Accepts floats or NumPy arrays.
+        """
+
+        if np.ndim(adjusted_foi) == 0:
+            # single rates (floats or duals), with the term as the limit of no adjusted rate.
+            if adjusted_foi == 0:
+                return annuity_term
+            amortized = -np.expm1(-adjusted_foi * annuity_term)
+            return amortized / (adjusted_foi if(is_time_continuous)else(-np.expm1(-adjusted_foi)))
+
+        adjusted_foi = np.asarray(adjusted_foi, dtype= float)
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            # (1 - adjusted discount factor) / (adjusted discount rate or foi), with the term as the limit of no adjusted rate.
+            amortized = -np.expm1(-adjusted_foi * annuity_term)
+            factor = amortized / (adjusted_foi if(is_time_continuous)else(-np.expm1(-adjusted_foi)))
+            return np.where(adjusted_foi == 0, annuity_term, factor)
+
+
+    def geometric_pv(annuity: Annuity, growth_rate: float, is_time_continuous: bool= False):
+        """
+            Returns the present value of an annuity whose payments grow by the growth rate once a year, starting at one per year.
+            Time continuous annuities grow continuously at the growth rate instead. Only compound rates are supported.
+        """
+
+        rate = annuity.annuity_rate
+        if rate.is_simple_rate:
+            raise ValueError("The annuity rate is invalid. Geometric annuities are only available for compound rates.")
+
+        adjusted_foi = rate.foi - np.log1p(growth_rate)
+        if is_time_continuous:
+            return VaryAnnuityMethods.geometric_growth_factor(adjusted_foi, annuity.annuity_term, is_time_continuous= True)
+
+        # the first year's payments, repeated each year at the adjusted rate
+        first_year = Annuity(rate, annuity.payment_mode, annuity_term= 1, norminal_period= annuity.norminal_period).time_value()
+        return first_year * VaryAnnuityMethods.geometric_growth_factor(adjusted_foi, annuity.annuity_term)
+
+
 
 
 class VaryAnnuity:
@@ -75,8 +123,9 @@ class VaryAnnuity:
     base_amount: float
     vary_amount: float
     is_time_continuous: bool
+    growth_rate: float
 
-    def __init__(self, annuity_rate: Rate, base_amount: float= 1, vary_amount: float= 0, is_time_continuous: bool= False, is_decreasing: bool= False,  **kwargs):
+    def __init__(self, annuity_rate: Rate, base_amount: float= 1, vary_amount: float= 0, is_time_continuous: bool= False, is_decreasing: bool= False, growth_rate: float= None, **kwargs):
         self.annuity_rate = annuity_rate
         self.annuity = Annuity(annuity_rate, **kwargs)
         self.annuity_term = self.annuity.annuity_term
@@ -85,6 +134,9 @@ class VaryAnnuity:
         self.base_amount = base_amount
         self.is_time_continuous = is_time_continuous
 
+        # payments grow geometrically, rather than by the vary amount, when a growth rate is given.
+        self.growth_rate = growth_rate
+
     
     def time_value(self, differ_period: float= 0, differ_rate: Rate= None,  is_fv: bool= False):
         """
@@ -92,13 +144,18 @@ class VaryAnnuity:
             It also differs the annuity. 
         """ 
 
+        if isinstance(self.annuity_rate, YieldCurve):
+            return self.__curve_time_value(differ_rate, differ_period, is_fv)
 
         annuity_pv = None
-        if self.annuity.is_arrear:
+        if self.growth_rate is not None:
+            # geometrically increasing annuity
+            annuity_pv = self.base_amount * self.annuity.annuity_amount * VaryAnnuityMethods.geometric_pv(self.annuity, self.growth_rate, self.is_time_continuous and (not self.annuity.is_arrear))
+
+        elif self.annuity.is_arrear:
             # increasing annuity paid in arrears
             inc_arrear = VaryAnnuityMethods.increasing_arrear_pv(self.annuity)
             annuity_pv = (self.base_amount - self.vary_amount) * self.annuity.time_value() + self.vary_amount * inc_arrear
-            print(inc_arrear, )
 
         elif self.is_time_continuous:
             # increasing annuity paid continously with the varrying amount varrying with per unit time   
@@ -121,9 +178,9 @@ class VaryAnnuity:
             differ_rate = self.annuity_rate
 
         
-        elif not isinstance(differ_rate, Rate):
+        elif not isinstance(differ_rate, (Rate, YieldCurve)):
             # using assinged differ rate
-            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' not {type(differ_rate)}.")
+            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' or 'YieldCurve' not {type(differ_rate)}.")
 
         annuity_pv *= differ_rate.time_value_factor(differ_period, discount= True)
         
@@ -135,6 +192,92 @@ class VaryAnnuity:
         return annuity_pv 
 
 
+    def __curve_payments(self, breakpoints):
+        """
+            Returns the payment times of the varying annuity and the amount paid (or paid per unit time) at each.
+            Amounts step up once a year, so the payments match the flat rate formulas for every norminal period.
+        """
+
+        annuity = self.annuity
+        if (not annuity.is_arrear) and self.is_time_continuous:
+            # the amount paid per unit time grows with time
+            times, weights = annuity.payment_grid(breakpoints, is_continuous= True)
+            growth = times if(self.growth_rate is None)else(annuity.annuity_amount * (1 + self.growth_rate) ** times)
+            return times, weights * self.base_amount * growth
+
+        times, weights = annuity.payment_grid(breakpoints)
+        if annuity.is_continuous:
+            year = np.floor(times) + 1
+        else:
+            # the year in which each norminal period starts
+            start = np.round(times * annuity.norminal_period) - annuity.is_arrear
+            year = np.floor(start / annuity.norminal_period) + 1
+
+        if self.growth_rate is not None:
+            return times, weights * self.base_amount * annuity.annuity_amount * (1 + self.growth_rate) ** (year - 1)
+
+        return times, weights * ((self.base_amount - self.vary_amount) * annuity.annuity_amount + self.vary_amount * year)
+
+
+    def sensitivities(self, differ_period: float= 0, is_fv: bool= False):
+        """
+            Returns the time value with its analytic derivatives in the force of interest and the interest rate, duration, convexity and DV01, in one pass.
+            Deferral is at the annuity rate, as in time_value. Only compound rates are supported.
+        """
+
+        rate = self.annuity_rate
+        if not isinstance(rate, Rate):
+            raise TypeError(f"The annuity rate is invalid. Sensitivities need a 'Rate' not {type(rate)}.")
+        if rate.is_simple_rate:
+            raise ValueError("The annuity rate is invalid. Sensitivities are only available for compound rates.")
+
+        annuity = self.annuity
+        if self.growth_rate is not None:
+            # geometrically increasing annuity, deferred (or accumulated) at the annuity rate
+            pv = AnnuityDerivativeMethods.geometric_pv(rate.foi, self.growth_rate, self.is_time_continuous, annuity.is_arrear, annuity.is_advance, self.annuity_term, annuity.norminal_period)
+            pv = AnnuityDerivativeMethods.jet_product(pv, AnnuityDerivativeMethods.jet_exp(rate.foi, -differ_period if(not is_fv)else(self.annuity_term)))
+            pv = tuple(order * self.base_amount * annuity.annuity_amount for order in pv)
+        else:
+            pv = AnnuityDerivativeMethods.vary_annuity_pv(rate.foi, self.base_amount, self.vary_amount, self.is_time_continuous, annuity.is_arrear, annuity.is_advance, self.annuity_term, annuity.annuity_amount, annuity.norminal_period, differ_period, is_fv)
+
+        return {name: float(value) for name, value in AnnuityDerivativeMethods.sensitivities(pv, rate.interest_rate).items()}
+
+
+    def to_cash_flows(self, differ_period: float= 0):
+        """
+            Returns the payments of the varying annuity as CashFlows, deferred by the differ period.
+            Amounts step up once a year, as when the annuity is priced against a yield curve.
+        """
+
+        times, amounts = self.__curve_payments(())
+        return CashFlows(amounts, times + differ_period)
+
+
+    def __curve_time_value(self, differ_rate, differ_period: float, is_fv: bool):
+        """
+            Returns the time value of a varying annuity priced against a yield curve by discounting each payment on the curve.
+        """
+
+        curve = self.annuity_rate
+        if differ_rate == None:
+            # payments are discounted on the curve from their deferred times.
+            times, amounts = self.__curve_payments(curve.tenors - differ_period)
+            annuity_pv = np.sum(amounts * curve.discount_factors(times + differ_period))
+
+        elif isinstance(differ_rate, (Rate, YieldCurve)):
+            times, amounts = self.__curve_payments(curve.tenors)
+            annuity_pv = np.sum(amounts * curve.discount_factors(times)) * differ_rate.time_value_factor(differ_period, discount= True)
+
+        else:
+            raise TypeError(f"The differ rate is invalid. It should be of type 'Rate' or 'YieldCurve' not {type(differ_rate)}.")
+
+        # Future Value
+        if is_fv:
+            annuity_pv *= curve.time_value_factor(self.annuity_term + differ_period)
+
+        return float(annuity_pv)
+
+
 
 if __name__ == "__main__":
     rate = Rate(0.034)
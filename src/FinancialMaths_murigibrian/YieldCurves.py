@@ -0,0 +1,164 @@
+import numpy as np
+
+from .RateBatches import RateBatch
+
+
+class YieldCurve:
+    """
+        A term structure of interest rates built from (tenor, rate) pillars.
+        Pillar rates may take any form a Rate supports. They are held as continuously compounded zero rates (foi).
+    """
+
+    tenors: np.ndarray
+    zero_foi: np.ndarray
+    interpolation: str
+
+    def __init__(self, tenors, rates, norminal_period= 1, is_foi= False, is_simple= False, is_discount= False, interpolation: str= "linear"):
+        self.__set_interpolation(interpolation)
+
+        # Validate Entries
+        tenors = np.asarray(tenors, dtype= float)
+        pillars = RateBatch(rates, norminal_period= norminal_period, is_foi= is_foi, is_simple= is_simple, is_discount= is_discount)
+        self.__validate_entries(tenors, pillars)
+
+        # pillars are held in order of tenor, as zero rates.
+        order = np.argsort(tenors, kind= "stable")
+        zero_foi = np.log(pillars.time_value_factor(tenors)) / tenors
+
+        self.tenors = tenors[order]
+        self.zero_foi = zero_foi[order]
+        self.__log_discount = np.r_[0.0, -self.zero_foi * self.tenors]
+        self.__slopes = self.__monotone_slopes() if(self.interpolation == "monotone-cubic")else(None)
+
+
+    def __set_interpolation(self, interpolation: str):
+        """
+            Sets the interpolation method.
+            Either linear (zero rates), log-linear (discount factors) or monotone-cubic (zero rates).
+        """
+
+        name = interpolation.lower().strip()
+        if "log" in name:
+            self.interpolation = "log-linear"
+        elif ("cubic" in name) or ("monotone" in name):
+            self.interpolation = "monotone-cubic"
+        elif "linear" in name:
+            self.interpolation = "linear"
+        else:
+            raise AssertionError(f"The interpolation {name} is invalid.\n\t\tThe valid interpolations are: 'linear', 'log-linear', 'monotone-cubic'")
+
+
+    def __validate_entries(self, tenors: np.ndarray, pillars: RateBatch):
+        """
+            Validates varables values and raises errors where relevant.
+        """
+
+        # there should be one rate per tenor
+        if tenors.ndim != 1 or len(tenors) == 0 or pillars.interest_rate.shape != tenors.shape:
+            raise ValueError("The pillars are invalid. Provide one rate for each of at least one tenor.")
+
+        # tenors should be positive and distinct
+        if np.any(tenors <= 0):
+            raise ValueError("The pillar tenors are invalid. They should be positive float values.")
+        if len(np.unique(tenors)) != len(tenors):
+            raise ValueError("The pillar tenors are invalid. Each tenor should appear once.")
+
+
+    def __monotone_slopes(self):
+        """
+            Returns the Fritsch-Carlson slopes of the zero rates at the pillars, which keep the cubic monotone between pillars.
+        """
+
+        slopes = np.zeros_like(self.zero_foi)
+        if len(self.tenors) < 2:
+            return slopes
+
+        widths = np.diff(self.tenors)
+        secants = np.diff(self.zero_foi) / widths
+        slopes[0] = secants[0]
+        slopes[-1] = secants[-1]
+
+        # weighted harmonic mean of neighbouring secants, or flat at a local extreme.
+        left, right = secants[:-1], secants[1:]
+        left_weight = 2 * widths[1:] + widths[:-1]
+        right_weight = widths[1:] + 2 * widths[:-1]
+        is_monotone = left * right > 0
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            slopes[1:-1] = np.where(is_monotone, (left_weight + right_weight) / (left_weight / left + right_weight / right), 0)
+
+        return slopes
+
+
+    def __segments(self, times: np.ndarray, nodes: np.ndarray):
+        """
+            Returns the index of the segment between nodes holding each time, found by binary search, and the position within it.
+        """
+
+        index = np.clip(np.searchsorted(nodes, times, side= "right") - 1, 0, len(nodes) - 2)
+        position = (times - nodes[index]) / (nodes[index + 1] - nodes[index])
+        return index, position
+
+
+    def zero_rates(self, times):
+        """
+            Returns the continuously compounded zero rates (foi) at the times.
+        """
+
+        times = np.asarray(times, dtype= float)
+        if self.interpolation == "log-linear":
+            with np.errstate(divide= "ignore", invalid= "ignore"):
+                return np.where(times > 0, -self.__log_linear(times) / times, self.zero_foi[0])
+
+        if len(self.tenors) == 1:
+            return np.full(times.shape, self.zero_foi[0])
+
+        # zero rates are flat before the first and after the last pillar
+        clipped = np.clip(times, self.tenors[0], self.tenors[-1])
+        index, position = self.__segments(clipped, self.tenors)
+        start, end = self.zero_foi[index], self.zero_foi[index + 1]
+
+        if self.interpolation == "linear":
+            return start + position * (end - start)
+
+        # cubic hermite polynomial between the pillars
+        width = self.tenors[index + 1] - self.tenors[index]
+        position_2 = position * position
+        position_3 = position_2 * position
+        return ((2 * position_3 - 3 * position_2 + 1) * start + (position_3 - 2 * position_2 + position) * width * self.__slopes[index]
+                + (-2 * position_3 + 3 * position_2) * end + (position_3 - position_2) * width * self.__slopes[index + 1])
+
+
+    def __log_linear(self, times: np.ndarray):
+        """
+            Returns the log discount factors at the times, linear between pillars and with a flat forward rate after the last pillar.
+        """
+
+        nodes = np.r_[0.0, self.tenors]
+        index, position = self.__segments(times, nodes)
+        start, end = self.__log_discount[index], self.__log_discount[index + 1]
+        return start + position * (end - start)
+
+
+    def discount_factors(self, times):
+        """
+            Returns the discount factors of the times, evaluated for the whole array at once.
+        """
+
+        times = np.asarray(times, dtype= float)
+        if self.interpolation == "log-linear":
+            return np.exp(self.__log_linear(times))
+
+        return np.exp(-self.zero_rates(times) * times)
+
+
+    def time_value_factor(self, period, discount: bool= False):
+        """
+            Returns the time value factor (accumulating and discounting factors) of the curve.
+            Mirrors Rate.time_value_factor so a curve can stand in for a Rate.
+        """
+
+        period = np.asarray(period, dtype= float)
+        factor = self.discount_factors(np.abs(period))
+        factor = np.where(np.logical_or(discount, period < 0), factor, 1 / factor)
+
+        return factor if(factor.ndim)else(float(factor))
@@ -0,0 +1,145 @@
+import numpy as np
+
+from .AnnuityDerivatives import AnnuityDerivativeMethods
+from .Annuities import Annuity
+from .Conventions import PaymentMode
+from .VaryAnnuities import VaryAnnuity
+
+# Forces of interest searched for a yield, i.e. effective rates from about -86% to 14,700%.
+FOI_BRACKET = (-2.0, 5.0)
+
+# Newton iterations stop once a step moves the force of interest by less than this (relative) amount.
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 100
+
+
+class YieldSolver:
+    """
+        Solves for the effective interest rates at which annuities or cash flows are worth given prices.
+        Newton steps use the analytic derivatives of the annuity formulas; bisection of a bracket takes over whenever a step leaves it.
+        Present values should fall as the rate rises, as they do for non-negative payments.
+    """
+
+    def solve_foi(pv_function, price, tolerance: float= TOLERANCE, max_iterations: int= MAX_ITERATIONS):
+        """
+            Returns the forces of interest at which 'pv_function' matches the prices, or NaN where no root lies in FOI_BRACKET.
+            'pv_function(foi, rows)' returns the (value, first derivative, ...) of the given rows at their forces of interest.
+            All rows are iterated together and each row leaves the iteration once it converges.
+        """
+
+        price = np.asarray(price, dtype= float)
+        rows = np.arange(len(price))
+        lower = np.full(len(price), FOI_BRACKET[0])
+        upper = np.full(len(price), FOI_BRACKET[1])
+
+        # the prices should lie between the values at both ends of the bracket
+        is_bracketed = (pv_function(lower, rows)[0] >= price) & (pv_function(upper, rows)[0] <= price)
+
+        foi = np.full(len(price), np.nan)
+        guess = np.full(len(price), 0.05)
+        active = rows[is_bracketed]
+        for _ in range(max_iterations):
+            if len(active) == 0:
+                break
+
+            value, slope = pv_function(guess[active], active)[:2]
+            error = value - price[active]
+
+            # the root lies above guesses that are worth too much
+            is_low = error > 0
+            lower[active] = np.where(is_low, guess[active], lower[active])
+            upper[active] = np.where(is_low, upper[active], guess[active])
+
+            # Newton step, or bisection when the step leaves the bracket
+            with np.errstate(divide= "ignore", invalid= "ignore"):
+                step = guess[active] - error / slope
+            is_inside = (step > lower[active]) & (step < upper[active])
+            step = np.where(error == 0, guess[active], np.where(is_inside, step, (lower[active] + upper[active]) / 2))
+
+            is_converged = (np.abs(step - guess[active]) <= tolerance * np.maximum(1, np.abs(step))) | (error == 0)
+            guess[active] = step
+            foi[active[is_converged]] = step[is_converged]
+            active = active[~is_converged]
+
+        return foi
+
+
+    def annuity_yields(price, payment_mode= "arrear", annuity_term= 1, annuity_amount= 1, norminal_period= 1, differ_period= 0, tolerance: float= TOLERANCE, max_iterations: int= MAX_ITERATIONS):
+        """
+            Returns the effective interest rates at which the annuities described by the columns are worth the prices.
+            Deferral is at the solved rate. Rows without a yield are NaN.
+        """
+
+        is_arrear, is_continuous, is_advance = PaymentMode.parse_flags(payment_mode)
+        columns = np.broadcast_arrays(np.asarray(price, dtype= float), is_arrear, is_advance, np.asarray(annuity_term, dtype= float), np.asarray(annuity_amount, dtype= float), np.asarray(norminal_period, dtype= float), np.asarray(differ_period, dtype= float))
+        shape = columns[0].shape
+        price, is_arrear, is_advance, annuity_term, annuity_amount, norminal_period, differ_period = (column.ravel() for column in columns)
+
+        pv_function = lambda foi, rows: AnnuityDerivativeMethods.annuity_pv(foi, is_arrear[rows], is_advance[rows], annuity_term[rows], annuity_amount[rows], norminal_period[rows], differ_period[rows])
+        foi = YieldSolver.solve_foi(pv_function, price, tolerance= tolerance, max_iterations= max_iterations)
+
+        return np.expm1(foi).reshape(shape)
+
+
+    def vary_annuity_yields(price, base_amount= 1, vary_amount= 0, is_time_continuous= False, payment_mode= "arrear", annuity_term= 1, annuity_amount= 1, norminal_period= 1, differ_period= 0, tolerance: float= TOLERANCE, max_iterations: int= MAX_ITERATIONS):
+        """
+            Returns the effective interest rates at which the varying annuities described by the columns are worth the prices.
+            Decreasing annuities take a negative vary amount. Deferral is at the solved rate. Rows without a yield are NaN.
+        """
+
+        is_arrear, is_continuous, is_advance = PaymentMode.parse_flags(payment_mode)
+        columns = np.broadcast_arrays(np.asarray(price, dtype= float), np.asarray(base_amount, dtype= float), np.asarray(vary_amount, dtype= float), np.asarray(is_time_continuous, dtype= bool), is_arrear, is_advance, np.asarray(annuity_term, dtype= float), np.asarray(annuity_amount, dtype= float), np.asarray(norminal_period, dtype= float), np.asarray(differ_period, dtype= float))
+        shape = columns[0].shape
+        price, base_amount, vary_amount, is_time_continuous, is_arrear, is_advance, annuity_term, annuity_amount, norminal_period, differ_period = (column.ravel() for column in columns)
+
+        pv_function = lambda foi, rows: AnnuityDerivativeMethods.vary_annuity_pv(foi, base_amount[rows], vary_amount[rows], is_time_continuous[rows], is_arrear[rows], is_advance[rows], annuity_term[rows], annuity_amount[rows], norminal_period[rows], differ_period[rows])
+        foi = YieldSolver.solve_foi(pv_function, price, tolerance= tolerance, max_iterations= max_iterations)
+
+        return np.expm1(foi).reshape(shape)
+
+
+    def cash_flow_yields(amounts, times, price, tolerance: float= TOLERANCE, max_iterations: int= MAX_ITERATIONS):
+        """
+            Returns the effective interest rates at which streams of cash flows are worth the prices.
+            'amounts' and 'times' hold one stream per row (or a single stream as a 1-D array). Rows without a yield are NaN.
+        """
+
+        amounts, times = np.broadcast_arrays(np.atleast_2d(np.asarray(amounts, dtype= float)), np.atleast_2d(np.asarray(times, dtype= float)))
+        price = np.broadcast_to(np.asarray(price, dtype= float), len(amounts))
+
+        def pv_function(foi, rows):
+            discount = np.exp(-foi[:, None] * times[rows])
+            return (np.sum(amounts[rows] * discount, axis= 1), -np.sum(amounts[rows] * times[rows] * discount, axis= 1))
+
+        return np.expm1(YieldSolver.solve_foi(pv_function, price, tolerance= tolerance, max_iterations= max_iterations))
+
+
+    def annuity_yield(annuity: Annuity, price: float, differ_period: float= 0):
+        """
+            Returns the effective interest rate at which the annuity is worth the price, or NaN when there is none.
+        """
+
+        if not isinstance(annuity, Annuity):
+            raise TypeError(f"The annuity is invalid. It should be of type 'Annuity' not {type(annuity)}.")
+
+        return float(YieldSolver.annuity_yields(price, annuity.payment_mode, annuity.annuity_term, annuity.annuity_amount, annuity.norminal_period, differ_period))
+
+
+    def vary_annuity_yield(vary_annuity: VaryAnnuity, price: float, differ_period: float= 0):
+        """
+            Returns the effective interest rate at which the varying annuity is worth the price, or NaN when there is none.
+        """
+
+        if not isinstance(vary_annuity, VaryAnnuity):
+            raise TypeError(f"The annuity is invalid. It should be of type 'VaryAnnuity' not {type(vary_annuity)}.")
+
+        annuity = vary_annuity.annuity
+        return float(YieldSolver.vary_annuity_yields(price, vary_annuity.base_amount, vary_annuity.vary_amount, vary_annuity.is_time_continuous, annuity.payment_mode, annuity.annuity_term, annuity.annuity_amount, annuity.norminal_period, differ_period))
+
+
+    def cash_flow_yield(amounts, times, price: float):
+        """
+            Returns the effective interest rate at which a single stream of cash flows is worth the price, or NaN when there is none.
+        """
+
+        return float(YieldSolver.cash_flow_yields(amounts, times, price)[0])
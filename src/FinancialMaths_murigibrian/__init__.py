@@ -1,4 +1,19 @@
 from .InterestRateMethods import AccumulationRateMethods, DiscountRateMethods
-from .InterestRates import Rate
+from .InterestRates import Rate, FrozenRate
+from .Duals import Dual
 from .Annuities import Annuity
 from .VaryAnnuities import VaryAnnuity, VaryAnnuityMethods
+from .RateBatches import RateBatch
+from .RateConverters import RateConverter, CONVENTIONS
+from .AnnuityPortfolios import AnnuityPortfolio
+from .FactorCaches import FactorCache
+from .Conventions import RateType, PaymentMode
+from .YieldCurves import YieldCurve
+from .YieldSolvers import YieldSolver
+from .LoanSolvers import LoanSolver
+from .CashFlows import CashFlows
+from .ValuationRunners import ValuationRunner, CONTRACT_DTYPE
+from .QuoteServices import QuoteService
+from .ScenarioEngines import ScenarioEngine
+from .StochasticRates import LognormalRates, AR1Rates, RateSimulation
+from .Instrumentation import Instrumentation
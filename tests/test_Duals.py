@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from FinancialMaths_murigibrian import Annuity, Dual, Rate
+
+
+def test_ufuncs_of_duals():
+    value = np.exp(Dual(0.0, 1.0)) * np.array(3.0)
+
+    assert value.value == pytest.approx(3.0)
+    assert value.gradient == pytest.approx(3.0)
+
+
+def test_arrays_of_floats_raise():
+    with pytest.raises(TypeError):
+        np.array([1.0, 2.0]) * Dual(2.0)
+    with pytest.raises(TypeError):
+        np.add(np.ones(2), Dual(1.0))
+
+
+def test_annuity_gradient():
+    rate, amount = Dual.variables(0.05, 100.0)
+    value = Annuity(Rate(rate), annuity_term= 10, annuity_amount= amount).time_value()
+    step = 1e-6
+
+    assert value.gradient[0] == pytest.approx((Annuity(Rate(0.05 + step), annuity_term= 10, annuity_amount= 100).time_value() - Annuity(Rate(0.05 - step), annuity_term= 10, annuity_amount= 100).time_value()) / (2 * step), rel= 1e-6)
+    assert value.gradient[1] == pytest.approx(Annuity(Rate(0.05), annuity_term= 10).time_value(), rel= 1e-12)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from FinancialMaths_murigibrian import FrozenRate, Rate, RateType
+
+
+def test_frozen_conversions_match_rate():
+    frozen = FrozenRate(0.05)
+    rate = Rate(0.05)
+
+    assert frozen.convert_to("compound interest", norminal_period= 4) == rate.convert_to("compound interest", norminal_period= 4)
+    assert frozen.convert_to(" Compound Discount ", norminal_period= 12) == rate.convert_to(RateType.COMPOUND_DISCOUNT, norminal_period= 12)
+
+
+def test_frozen_conversions_share_the_memo_across_names():
+    frozen = FrozenRate(0.05)
+
+    assert frozen.convert_to("compound interest", norminal_period= 4) is frozen.convert_to(RateType.COMPOUND_INTEREST, norminal_period= 4)
+
+
+def test_frozen_conversions_of_array_periods():
+    frozen = FrozenRate(0.05)
+    periods = np.array([1, 4, 12])
+    expected = Rate(0.05).convert_to("compound interest", norminal_period= periods)
+
+    np.testing.assert_allclose(frozen.convert_to("compound interest", norminal_period= periods), expected)
+    np.testing.assert_allclose(frozen.convert_to("compound interest", norminal_period= np.array(4.0)), Rate(0.05).convert_to("compound interest", norminal_period= 4))
+
+
+def test_frozen_conversions_to_unknown_types_raise():
+    with pytest.raises(AssertionError):
+        FrozenRate(0.05).convert_to("annuity")
@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import Executor, Future
+
+import pytest
+
+from FinancialMaths_murigibrian import Annuity, QuoteService, Rate
+
+
+class IdleExecutor(Executor):
+    """ Accepts work but never runs it, so its batches stay in flight until cancelled. """
+
+    def submit(self, fn, *args, **kwargs):
+        return Future()
+
+
+def test_quotes_match_annuity():
+    async def run():
+        async with QuoteService() as service:
+            return await asyncio.gather(service.quote(0.05, "arrear", 10, 100), service.quote(0.04, "advance", 5, 20, 4, 2))
+
+    values = asyncio.run(run())
+    assert values[0] == pytest.approx(Annuity(Rate(0.05), "arrear", 10, 100).time_value(), rel= 1e-12)
+    assert values[1] == pytest.approx(Annuity(Rate(0.04), "advance", 5, 20, 4).time_value(differ_period= 2), rel= 1e-12)
+
+
+def test_cancelled_batch_cancels_its_quotes():
+    async def run():
+        service = QuoteService(window= 0, executor= IdleExecutor())
+        quotes = [asyncio.ensure_future(service.quote(0.05, annuity_term= 10)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        for priced in list(service._QuoteService__in_flight):
+            priced.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*quotes, return_exceptions= True), timeout= 1)
+        await service.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
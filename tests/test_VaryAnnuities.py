@@ -0,0 +1,57 @@
+import pytest
+
+from FinancialMaths_murigibrian import Annuity, AnnuityPortfolio, Rate, RateBatch, VaryAnnuity, YieldCurve
+
+# (payment mode, time continuous) pairs covering arrear, advance, continuous and time continuous payments
+PAYMENT_MODES = [("arrear", False), ("advance", False), ("continuous", False), ("continuous", True)]
+
+
+@pytest.mark.parametrize("payment_mode, is_time_continuous", PAYMENT_MODES)
+@pytest.mark.parametrize("norminal_period", [1, 4, 12])
+@pytest.mark.parametrize("differ_period", [0, 1.5])
+def test_flat_curve_matches_rate(payment_mode, is_time_continuous, norminal_period, differ_period):
+    # a flat curve discounts every payment at the flat rate
+    kwargs = dict(base_amount= 3, vary_amount= 2, is_time_continuous= is_time_continuous, payment_mode= payment_mode, annuity_term= 10, annuity_amount= 7, norminal_period= norminal_period)
+    rate_value = VaryAnnuity(Rate(0.05), **kwargs).time_value(differ_period= differ_period)
+    curve_value = VaryAnnuity(YieldCurve([1, 5, 30], [0.05] * 3), **kwargs).time_value(differ_period= differ_period)
+
+    assert curve_value == pytest.approx(rate_value, rel= 1e-10)
+
+
+@pytest.mark.parametrize("payment_mode, is_time_continuous", PAYMENT_MODES)
+@pytest.mark.parametrize("norminal_period", [1, 4, 12])
+def test_cash_flows_match_time_value(payment_mode, is_time_continuous, norminal_period):
+    rate = Rate(0.05)
+    annuity = VaryAnnuity(rate, base_amount= 3, vary_amount= 2, is_time_continuous= is_time_continuous, payment_mode= payment_mode, annuity_term= 10, annuity_amount= 7, norminal_period= norminal_period)
+
+    assert annuity.to_cash_flows().npv(rate) == pytest.approx(annuity.time_value(), rel= 1e-10)
+
+
+@pytest.mark.parametrize("payment_mode", ["arrear", "advance", "continuous"])
+@pytest.mark.parametrize("norminal_period", [1, 4, 12])
+def test_no_growth_matches_level_annuity(payment_mode, norminal_period):
+    rate = Rate(0.05)
+    level = Annuity(rate, payment_mode, 10, 100, norminal_period).time_value()
+    annuity = VaryAnnuity(rate, base_amount= 1, growth_rate= 1e-12, payment_mode= payment_mode, annuity_term= 10, annuity_amount= 100, norminal_period= norminal_period)
+
+    assert annuity.time_value() == pytest.approx(level, rel= 1e-9)
+    assert annuity.to_cash_flows().npv(rate) == pytest.approx(level, rel= 1e-9)
+    assert annuity.sensitivities()["time_value"] == pytest.approx(level, rel= 1e-9)
+
+
+@pytest.mark.parametrize("payment_mode, is_time_continuous", PAYMENT_MODES)
+@pytest.mark.parametrize("norminal_period", [1, 4, 12])
+def test_geometric_amounts_match_portfolio(payment_mode, is_time_continuous, norminal_period):
+    rate = Rate(0.05)
+    annuity = VaryAnnuity(rate, base_amount= 2, growth_rate= 0.02, is_time_continuous= is_time_continuous, payment_mode= payment_mode, annuity_term= 10, annuity_amount= 100, norminal_period= norminal_period)
+    portfolio = AnnuityPortfolio(RateBatch([0.05]), payment_mode, 10, 200, norminal_period)
+
+    assert annuity.to_cash_flows().npv(rate) == pytest.approx(annuity.time_value(), rel= 1e-10)
+    assert portfolio.geometric_time_value(0.02, is_time_continuous)[0] == pytest.approx(annuity.time_value(), rel= 1e-10)
+
+
+def test_geometric_simple_rates_raise():
+    with pytest.raises(ValueError):
+        VaryAnnuity(Rate(0.05, is_simple= True), growth_rate= 0.02, annuity_term= 10).time_value()
+    with pytest.raises(ValueError):
+        AnnuityPortfolio(RateBatch([0.05, 0.04], is_simple= [True, False]), annuity_term= 10).geometric_time_value(0.02)